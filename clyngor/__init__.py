@@ -1,12 +1,50 @@
 CLINGO_BIN_PATH = 'clingo'
 __version__ = '0.3.10.dev0'
 
-from clyngor.utils import ASPSyntaxError, ASPWarning, clingo_value_to_python
+from clyngor.utils import ASPSyntaxError, ASPWarning, ResourceLimitError, clingo_value_to_python
 from clyngor.answers import Answers, ClingoAnswers
-from clyngor.solving import solve, clingo_version, command
+from clyngor.solving import solve, clingo_version, clear_probe_cache, command
 from clyngor.inline import ASP
-from clyngor.upapi import converted_types, converted_types_or_symbols
-from clyngor.propagators import Propagator, Variable, Main, Constraint
+
+
+# attributes imported only when first accessed, keeping `import clyngor` fast
+_LAZY_ATTRIBUTES = {
+    'ClingoPool': 'clyngor.pool',
+    'solve_many': 'clyngor.batching',
+    'asolve': 'clyngor.async_solving',
+    'ResultCache': 'clyngor.caching',
+    'CoreScheduler': 'clyngor.scheduling',
+    'Coalescer': 'clyngor.coalescing',
+    'ForkServer': 'clyngor.forking',
+    'SolvingServer': 'clyngor.serving',
+    'tune': 'clyngor.tuning',
+    'sample': 'clyngor.sampling',
+    'RemoteExecutor': 'clyngor.remote',
+    'converted_types': 'clyngor.upapi',
+    'converted_types_or_symbols': 'clyngor.upapi',
+    'Propagator': 'clyngor.propagators',
+    'Variable': 'clyngor.propagators',
+    'Main': 'clyngor.propagators',
+    'Constraint': 'clyngor.propagators',
+}
+
+def __getattr__(name:str) -> object:
+    if name == 'clingo_module':
+        load_clingo_module()
+        return clingo_module
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif 'clyngor.' + name in _LAZY_ATTRIBUTES.values():  # the submodule itself
+        import importlib
+        value = importlib.import_module('clyngor.' + name)
+    else:
+        raise AttributeError("module 'clyngor' has no attribute {}".format(repr(name)))
+    globals()[name] = value  # next accesses don't go through __getattr__
+    return value
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | {'clingo_module'})
 
 
 def load_clingo_module() -> bool:
@@ -17,13 +55,13 @@ def load_clingo_module() -> bool:
     globals()['clingo_module'] = clingo_module
 
 def have_clingo_module() -> bool:
+    if 'clingo_module' not in globals():  # imported only once needed
+        load_clingo_module()
     return clingo_module is not None
 
 def deactivate_clingo_module():
     globals()['clingo_module'] = None
 
-load_clingo_module()
-
 
 def have_python_support(py2:bool=True, py3:bool=True) -> bool or None:
     """True if clingo supports python for given versions.
@@ -35,3 +73,26 @@ def have_python_support(py2:bool=True, py3:bool=True) -> bool or None:
 def have_lua_support() -> bool:
     """True if clingo supports lua"""
     return bool(clingo_version()['lua'])
+
+def capabilities(clingo_bin_path:str=None) -> dict:
+    """Return in a dict all that is known about clingo and the platform:
+    versions of the binary and its python and lua support,
+    availability of the python clingo module, of resource limits
+    and of process forking.
+
+    """
+    import os
+    import shutil
+    from clyngor import solving  # the module, not the function
+    version = clingo_version(clingo_bin_path)
+    return {
+        'clingo binary': shutil.which(clingo_bin_path or CLINGO_BIN_PATH),
+        'clingo version': version['clingo version'],
+        'versions': version,
+        'python support': version['python'],
+        'lua support': version['lua'],
+        'clingo module': getattr(clingo_module, '__version__', None) if have_clingo_module() else None,
+        'resource limits': solving.resource is not None,
+        'fork': hasattr(os, 'fork'),
+        'cpu affinity': hasattr(os, 'sched_setaffinity'),
+    }
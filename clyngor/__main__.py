@@ -1,4 +1,6 @@
 
+import sys
+import argparse
 from timeit import timeit
 from pprint import pprint
 from functools import partial
@@ -20,7 +22,7 @@ def time_efficiency(number:int=1000) -> float:
     return 'Perform {} calls in {} seconds.'.format(number, round(timeit(run, number=number), 2))
 
 
-if __name__ == '__main__':
+def demo():
     answers = ASP(ASP_CODE)
     for answer in answers.by_predicate.first_arg_only:
         print('{' + ','.join(answer['obj']) + '} × {' + ','.join(answer['att']) + '}')
@@ -29,3 +31,39 @@ if __name__ == '__main__':
     print('Benchmark:')
     print(time_efficiency())
     print()
+
+
+def cli_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m clyngor',
+                                     description='Without command, run a demo and a benchmark.')
+    commands = parser.add_subparsers(dest='command')
+    serve = commands.add_parser('serve', help='run a solving daemon on a Unix socket')
+    serve.add_argument('--socket', required=True, help='path to the Unix socket to create')
+    serve.add_argument('--workers', type=int, default=4, help='maximal number of concurrent solvings')
+    serve.add_argument('--timeout', type=float, default=None, help='default maximal number of seconds of a solving')
+    batch = commands.add_parser('batch', help='solve the jobs of a JSON lines manifest')
+    batch.add_argument('manifest', help='JSON lines file of solve() keyword arguments')
+    batch.add_argument('--out', required=True, help='JSON lines file receiving the results, also used to resume')
+    batch.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    worker = commands.add_parser('worker', help='run a solving worker on a TCP port')
+    worker.add_argument('--listen', required=True, help='address to listen on, as host:port')
+    worker.add_argument('--workers', type=int, default=4, help='maximal number of concurrent solvings')
+    worker.add_argument('--timeout', type=float, default=None, help='default maximal number of seconds of a solving')
+    return parser
+
+
+if __name__ == '__main__':
+    args = cli_parser().parse_args()
+    if args.command == 'serve':
+        from clyngor import serving  # imported by the subcommand needing it
+        serving.serve(args.socket, args.workers, args.timeout)
+    elif args.command == 'worker':
+        from clyngor import remote
+        remote.work(args.listen, args.workers, args.timeout)
+    elif args.command == 'batch':
+        from clyngor import batching
+        counts = batching.run_manifest(args.manifest, args.out, args.workers)
+        print('{solved} solved, {failed} failed, {skipped} skipped in {time:.2f}s'.format(**counts),
+              file=sys.stderr)
+    else:
+        demo()
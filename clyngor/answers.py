@@ -1,7 +1,11 @@
 """The Answers object"""
 
 
+import os
 import re
+import time
+import weakref
+import threading
 from collections import defaultdict
 
 import clyngor
@@ -18,13 +22,20 @@ class Answers:
     """
 
     def __init__(self, answers:iter, command:str='', statistics:dict={},
-                 *, with_optimization:bool=False, on_end:callable=None):
+                 *, with_optimization:bool=False, on_end:callable=None,
+                 on_close:callable=None, progression:list=None):
         """Answer sets must be iterable of (predicate, args).
 
         with_optimization -- answers are read as ((predicate, args), optimization)
                              allowing to retrieve optimization data of the answers.
                              See also Answers.with_optimization property.
-        on_end -- if callable, called when all answer sets are exhausted.
+        on_end -- if callable, called when all answer sets are exhausted,
+                  or when the answers are closed.
+        on_close -- if callable, called once when answers are closed before
+                    exhaustion, or garbage collected. Used to stop the solver,
+                    it must not hold a reference to the Answers instance.
+        progression -- list of solving events, updated by reading method.
+                       See Answers.progression property.
 
         """
         if not with_optimization:
@@ -33,6 +44,7 @@ class Answers:
         self._answers = iter(answers)
         self._command = str(command or '')
         self._statistics = statistics  # will be updated by reading method
+        self._progression = [] if progression is None else progression  # idem
         self._first_arg_only = False
         self._group_atoms = False
         self._as_pyasp = False
@@ -44,6 +56,12 @@ class Answers:
         self._ignore_args = False
         self._with_optimization = False
         self.__on_end = on_end or (lambda: None)
+        self.__ended = False
+        self.__on_close = weakref.finalize(self, on_close) if on_close else None
+        self._iterator = None  # used by __next__
+        self._closed = False
+        self._deadline, self._timer = None, None
+        self._cut_off = False  # True when deadline was reached
 
     @property
     def command(self) -> str:  return self._command
@@ -125,16 +143,96 @@ class Answers:
 
 
     def __next__(self):
-        return next(iter(self))
+        if self._iterator is None:
+            self._iterator = iter(self)
+        return next(self._iterator)
 
 
     def __iter__(self):
         """Yield answer sets"""
         for answer_set, optimization in self._answers:
+            if self._timed_out():
+                break
             answer_set = tuple(self._parse_answer(answer_set))
             parsed = self._format(answer_set)
             yield (parsed, optimization) if self._with_optimization else parsed
-        self.__on_end()
+        self._end()
+
+
+    def _end(self):
+        """Call the on_end callback, once"""
+        if self._timed_out() and self.__on_close is not None:
+            self.__on_close()  # stop the solver, once
+        if not self.__ended:
+            self.__ended = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self.__on_end()
+
+
+    def _set_deadline(self, deadline:float, on_timeout:callable):
+        """Stop yielding answers when time.monotonic() reaches given deadline.
+
+        on_timeout -- called at deadline to stop the solver,
+                      even if answers are not being consumed.
+
+        """
+        self._deadline = deadline
+        self._timer = threading.Timer(max(0, deadline - time.monotonic()), on_timeout)
+        self._timer.daemon = True
+        self._timer.start()
+
+
+    def _timed_out(self) -> bool:
+        """True if the deadline is reached"""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._cut_off = True
+        return self._cut_off
+
+
+    def close(self):
+        """Stop the solver and release its resources.
+        No answer will be yielded after that.
+
+        """
+        if self._iterator is not None:
+            self._iterator.close()
+        if hasattr(self._answers, 'close'):
+            self._answers.close()
+        self._answers = iter(())
+        if self.__on_close is not None:
+            self.__on_close()  # called only once
+        self._closed = True
+        self._end()
+
+    def _interrupt(self):
+        """Stop the solver, without closing the answers: unlike close,
+        may be called while another thread is reading them.
+
+        """
+        if self.__on_close is not None:
+            self.__on_close()  # called only once
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+    def _raw_answers(self) -> iter:
+        """Yield pairs (answer set, optimization) as given by the solver,
+        without any parsing nor formatting.
+
+        Used to transmit answers, and to build them back with
+        Answers(records, with_optimization=True).
+
+        """
+        for record in self._answers:
+            if self._timed_out():
+                break
+            yield record
+        self._end()
 
 
     def _parse_answer(self, answer_set:str) -> iter:
@@ -211,35 +309,167 @@ class Answers:
         """Shortcut"""
         return self._collapse_atoms and self._collapse_args
 
+    @property
+    def progression(self) -> list:
+        """Events of the solving read so far: models with their optimization,
+        and progressions of the optimization bounds, with their time.
+
+        """
+        return list(self._progression)
+
     @property
     def statistics(self) -> dict:
-        return dict(self._statistics)
+        statistics = dict(self._statistics)
+        if self._cut_off:
+            statistics['Deadline reached'] = True
+        return statistics
 
 
 class ClingoAnswers(Answers):
     """Proxy to the solver as called through the python clingo module.
 
     """
-    def __init__(self, solver, statistics:callable=(lambda: {})):
+    def __init__(self, solver, statistics:callable=(lambda: {}),
+                 checkpoint:str=None, checkpoint_every:int=100):
+        """
+        solver -- grounded clingo.Control instance
+        checkpoint -- file where enumerated models are saved. If it already
+                      contains models, they are forbidden to the solver,
+                      so only new models are yielded.
+        checkpoint_every -- number of models found between two saves
+
+        """
         assert clyngor.have_clingo_module()
         super().__init__(())
         self._solver = solver
-        self._statistics = lambda s=solver: json.dumps(s.statistics, sort_keys=True,
-                                                       indent=4, separators=(',', ': '))
+        self._statistics = lambda s=solver: dict(s.statistics)
+        self._handle = None  # solve handle of the current iteration
+        self._checkpoint = checkpoint
+        self._checkpoint_every = max(1, int(checkpoint_every))
+        self._unsaved = []  # models not yet written in checkpoint
+        self._resumed = 0  # number of models found in checkpoint
+        if checkpoint and os.path.exists(checkpoint):
+            self._resume(checkpoint)
         assert callable(self._statistics)
 
 
+    def _resume(self, checkpoint:str):
+        """Forbid models found in given checkpoint file"""
+        models = tuple(load_checkpoint(checkpoint))
+        literals = {
+            str(atom.symbol): atom.literal
+            for atom in self._solver.symbolic_atoms
+            if not atom.is_fact
+        }
+        all_literals = set(literals.values())  # equivalent atoms share literals
+        with self._solver.backend() as backend:
+            for model in models:
+                model = {literals[atom] for atom in model if atom in literals}
+                # nogood: the exact same assignment of non-fact atoms
+                backend.add_rule([], [lit if lit in model else -lit
+                                      for lit in all_literals])
+        self._resumed = len(models)
+
+
+    def _save(self, model:object=None):
+        """Add given model to the checkpoint, written every few models,
+        or now if no model is given.
+
+        """
+        if not self._checkpoint:
+            return
+        if model is not None:
+            self._unsaved.append(sorted(map(str, model.symbols(atoms=True))))
+            if len(self._unsaved) < self._checkpoint_every:
+                return
+        if self._unsaved:
+            import json  # checkpoints are rarely used
+            with open(self._checkpoint, 'a') as ofd:
+                for atoms in self._unsaved:
+                    ofd.write(json.dumps(atoms) + '\n')
+                ofd.flush()
+                os.fsync(ofd.fileno())
+            self._unsaved = []
+
+
+    def _end(self):
+        self._save()
+        super()._end()
+
+
+    def _solve_handle(self):
+        """Return the asynchronous solve handle yielding the models"""
+        try:
+            self._handle = self._solver.solve(yield_=True, async_=True)
+        except TypeError:  # clingo < 5.3 uses async, a keyword since python 3.7
+            self._handle = self._solver.solve(**{'yield_': True, 'async': True})
+        return self._handle
+
+
+    def close(self):
+        """Cancel the current solving, and stop iteration"""
+        if self._handle is not None:
+            self._handle.cancel()
+        super().close()
+
+
     def __iter__(self):
         """Yield answer sets"""
-        kwargs = {'yield_': True, 'async': True}  # compat with 3.7
-        with self._solver.solve(**kwargs) as models:
+        if self._closed:
+            return
+        if self._timed_out():  # reached while grounding: nothing to solve
+            self._end()
+            return
+        with self._solve_handle() as models:
             for model in models:
+                if self._timed_out():
+                    break
+                self._save(model)
                 answer_set = tuple((a.name, utils.clingo_value_to_python(a.arguments))
                                    for a in model.symbols(atoms=True))
                 parsed = self._format(answer_set)
+                optimization = tuple(model.cost) or None
                 yield (parsed, optimization) if self._with_optimization else parsed
+        self._end()
+
+
+    def _raw_answers(self) -> iter:
+        """Yield pairs (answer set, optimization) as given by the solver"""
+        if self._closed:
+            return
+        if self._timed_out():  # reached while grounding: nothing to solve
+            self._end()
+            return
+        with self._solve_handle() as models:
+            for model in models:
+                if self._timed_out():
+                    break
+                self._save(model)
+                yield (' '.join(map(str, model.symbols(atoms=True))),
+                       tuple(model.cost) or None)
+        self._end()
 
 
     @property
     def statistics(self) -> dict:
-        return self._statistics()
+        statistics = self._statistics()
+        if self._cut_off:
+            statistics['Deadline reached'] = True
+        if self._resumed:
+            statistics['Checkpointed models'] = self._resumed
+        return statistics
+
+
+def load_checkpoint(checkpoint:str) -> iter:
+    """Yield models, as lists of atoms, found in given checkpoint file.
+
+    An incomplete last line, as left by a crash, is ignored.
+
+    """
+    import json  # checkpoints are rarely used
+    with open(checkpoint) as ifd:
+        for line in ifd:
+            try:
+                yield json.loads(line)
+            except ValueError:  # partially written
+                return
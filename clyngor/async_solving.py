@@ -0,0 +1,219 @@
+"""Asyncio interface to clingo.
+
+    answers = await asolve(inline='1{a;b}1.')
+    async for answer in answers.by_predicate:
+        print(answer)
+
+The event loop is never blocked waiting for the solver: the clingo binary
+is run through asyncio subprocesses, and the solve handle of the clingo module
+is waited in an executor.
+Cancelling the task iterating over the answers terminates the solver.
+
+"""
+
+
+import asyncio
+import functools
+import threading
+import subprocess
+
+import clyngor
+from clyngor.answers import Answers, ClingoAnswers
+from clyngor.solving import command, _handle_stderr
+from clyngor.parsing import parse_clasp_output
+from clyngor.utils import cleaned_path
+from clyngor.propagators import Main as _default_running_sequence
+
+
+async def asolve(files:iter=(), options:iter=[], inline:str=None,
+                 print_command:bool=False, nb_model:int=0, time_limit:int=0,
+                 constants:dict={}, clean_path:bool=True, stats:bool=True,
+                 clingo_bin_path:str=None, error_on_warning:bool=False,
+                 use_clingo_module:bool=True, grounding_observers:iter=(),
+                 propagators:iter=(),
+                 running_sequence:callable=_default_running_sequence,
+                 programs:iter=(['base', ()],)) -> 'AsyncAnswers':
+    """Coroutine running the solver on given files, with given options,
+    and returning an AsyncAnswers instance yielding answer sets.
+
+    Parameters are the same as solving.solve ones.
+
+    """
+    files = [files] if isinstance(files, str) else files
+    files = tuple(map(cleaned_path, files) if clean_path else files)
+    use_clingo_module = use_clingo_module and clyngor.have_clingo_module()
+
+    if use_clingo_module:
+        if time_limit != 0 or constants:
+            raise ValueError("Options 'time_limit' and 'constants' are not "
+                             "handled when used with python clingo module.")
+        options = options.split() if isinstance(options, str) else options
+        if inline:  # only given if needed, to support other running sequences
+            running_sequence = functools.partial(running_sequence, inline=inline)
+        ctl = clyngor.clingo_module.Control(options)
+        main = running_sequence(programs=programs, files=files,
+                                nb_model=nb_model, propagators=propagators,
+                                observers=grounding_observers, generator=True)
+        return AsyncClingoAnswers(main(ctl)._solver)
+
+    # inline code is given through stdin, with '-' as filename if needed
+    if inline and files:
+        files = files + ('-',)
+    run_command = command(files, options, None, nb_model, time_limit,
+                          constants, stats, clingo_bin_path=clingo_bin_path)
+    if print_command:
+        print(run_command)
+    if not files and not inline:  # clingo would wait for stdin forever
+        return AsyncAnswers(_no_answers(), command=' '.join(run_command))
+
+    clingo = await asyncio.create_subprocess_exec(
+        *run_command,
+        stdin=subprocess.PIPE if inline else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if inline:
+        clingo.stdin.write(inline.encode())
+        await clingo.stdin.drain()
+        clingo.stdin.close()
+    statistics = {}
+    return AsyncAnswers(_gen_answers(clingo, statistics, error_on_warning),
+                        command=' '.join(run_command), statistics=statistics)
+
+
+class AsyncAnswers(Answers):
+    """Answers to be iterated with async for.
+
+    All formatting options of Answers are available.
+
+    """
+
+    def __init__(self, answers:iter, command:str='', statistics:dict={}):
+        """Answer sets must be an asynchronous iterable
+        of (answer set, optimization).
+
+        """
+        super().__init__((), command, statistics)
+        self._answers = answers
+        self._aiterator = None
+
+    def __iter__(self):
+        raise TypeError("AsyncAnswers must be iterated with 'async for'")
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def __anext__(self):
+        if self._aiterator is None:
+            self._aiterator = self._aiter()
+        return await self._aiterator.__anext__()
+
+    async def _aiter(self):
+        """Yield answer sets"""
+        async for answer_set, optimization in self._answers:
+            answer_set = tuple(self._parse_answer(answer_set))
+            parsed = self._format(answer_set)
+            yield (parsed, optimization) if self._with_optimization else parsed
+
+    async def aclose(self):
+        """Stop the solver"""
+        await self._answers.aclose()
+
+
+class AsyncClingoAnswers(ClingoAnswers):
+    """ClingoAnswers to be iterated with async for"""
+
+    def __init__(self, solver):
+        super().__init__(solver)
+        self._aiterator = None
+
+    def __iter__(self):
+        raise TypeError("AsyncClingoAnswers must be iterated with 'async for'")
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def __anext__(self):
+        if self._aiterator is None:
+            self._aiterator = self._aiter()
+        return await self._aiterator.__anext__()
+
+    async def _aiter(self):
+        """Yield answer sets, waiting for each model in an executor"""
+        loop = asyncio.get_event_loop()
+        with self._solve_handle() as handle:
+            try:
+                while True:
+                    handle.resume()
+                    await loop.run_in_executor(None, handle.wait)
+                    model = handle.model()
+                    if model is None:
+                        break
+                    answer_set = tuple((a.name, clyngor.clingo_value_to_python(a.arguments))
+                                       for a in model.symbols(atoms=True))
+                    optimization = tuple(model.cost) or None
+                    parsed = self._format(answer_set)
+                    yield (parsed, optimization) if self._with_optimization else parsed
+            except BaseException:  # cancelled, closed, or failed
+                handle.cancel()
+                raise
+
+
+async def _no_answers():
+    return
+    yield
+
+
+async def _gen_answers(clingo:asyncio.subprocess.Process, statistics:dict,
+                       error_on_warning:bool) -> (str, tuple or None):
+    """Yield pairs (answer set, optimization) read on clingo output,
+    and update given statistics dict with statistics payloads.
+
+    Asynchronous equivalent of solving._gen_answers: the output is parsed
+    by the same parse_clasp_output, run in an executor, its lines being read
+    in the event loop.
+
+    """
+    loop = asyncio.get_event_loop()
+    stderr = asyncio.ensure_future(clingo.stderr.read())
+    stopped = threading.Event()  # set when the parsing must end
+    def lines():  # run in the executor
+        while not stopped.is_set():
+            line = asyncio.run_coroutine_threadsafe(clingo.stdout.readline(), loop).result()
+            if not line:
+                return
+            yield line.decode()
+    parsed = parse_clasp_output(lines(), yield_stats=True)
+    parsing = None  # pending parsing of the next payload
+    try:
+        answer = None
+        while True:
+            # shielded, so a cancellation leaves the executor thread to be waited
+            parsing = loop.run_in_executor(None, next, parsed, None)
+            item = await asyncio.shield(parsing)
+            if item is None:
+                break
+            ptype, payload = item
+            if ptype == 'answer':
+                if answer is not None:
+                    yield answer, None  # no optimization to yield
+                answer = payload
+            elif ptype == 'optimization' and answer is not None:
+                yield answer, payload
+                answer = None
+            elif ptype == 'statistics':
+                statistics.update(payload)
+        if answer is not None:  # if no optimization, probably one miss
+            yield answer, None
+        await clingo.wait()
+        _handle_stderr(iter((await stderr).decode().splitlines()), error_on_warning)
+    finally:
+        stopped.set()
+        if clingo.returncode is None:  # stopped before the end
+            clingo.kill()
+        if parsing is not None:  # its line is read before the rest of the output
+            await asyncio.wait([parsing])
+        # the pipes must be emptied before the end of the process is known
+        await clingo.stdout.read()
+        await clingo.wait()
+        await asyncio.wait([stderr])
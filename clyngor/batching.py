@@ -0,0 +1,175 @@
+"""Solving of many independent programs on a pool of workers.
+
+    jobs = ({'files': ['encoding.lp', instance]} for instance in instances)
+    for job_id, answers in solve_many(jobs, max_workers=4):
+        print(job_id, tuple(answers.by_predicate))
+
+Jobs may also be given in a JSON lines manifest, results being written
+in another one:
+
+    python -m clyngor batch jobs.jsonl --workers 4 --out results.jsonl
+
+"""
+
+
+import os
+import sys
+import json
+import time
+import itertools
+from concurrent import futures
+
+from clyngor.answers import Answers
+from clyngor.solving import solve
+
+
+def solve_many(jobs:iter, max_workers:int=None, max_pending:int=None,
+               executor:futures.Executor=None, on_start:callable=None) -> iter:
+    """Yield pairs (job id, Answers) in order of completion of given jobs.
+
+    jobs -- iterable of solve() keyword arguments, or of pairs (job id, kwargs).
+            The id of a job is by default its index in the iterable.
+    max_workers -- number of worker processes (default to the number of CPUs)
+    max_pending -- maximal number of jobs submitted and not yet yielded
+                   (default to twice the number of workers)
+    executor -- concurrent.futures.Executor to use instead of a process pool
+    on_start -- called in the worker with the Answers of each job, before
+                reading them, e.g. to interrupt them. Needs an executor running
+                the jobs in this process, like a ThreadPoolExecutor.
+
+    Jobs are consumed only when there is room for them, so the iterable
+    is never loaded entirely.
+    If a job fails, the raised exception is given instead of the Answers.
+    The time spent by the worker on a job is given in the Answers statistics,
+    under the key 'Job time'.
+
+    """
+    if executor is None:
+        with futures.ProcessPoolExecutor(max_workers) as executor:
+            yield from solve_many(jobs, max_workers, max_pending, executor, on_start)
+        return
+    max_pending = int(max_pending or 2 * (max_workers or os.cpu_count() or 1))
+    if max_pending < 1:
+        raise ValueError("At least one job must be pending, not {}.".format(max_pending))
+    jobs = enumerate(jobs)
+    extra_args = () if on_start is None else (on_start,)  # remote runs get no hook
+    pending = {}  # future -> job id
+    try:
+        while True:
+            for idx, job in itertools.islice(jobs, max_pending - len(pending)):
+                job_id, kwargs = (idx, job) if isinstance(job, dict) else job
+                pending[executor.submit(_run_job, kwargs, *extra_args)] = job_id
+            if not pending:
+                break
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                job_id = pending.pop(future)
+                try:
+                    command, records, statistics = future.result()
+                except Exception as err:
+                    yield job_id, err
+                    continue
+                yield job_id, Answers(records, command=command,
+                                      statistics=statistics,
+                                      with_optimization=True)
+    finally:  # the consumer may have stopped early
+        for future in pending:
+            future.cancel()
+
+
+def _run_job(kwargs:dict, on_start:callable=None) -> (str, tuple, dict):
+    """Return command, raw answers and statistics of the solve call
+    parametrized with given keyword arguments.
+
+    on_start -- if given, called with the Answers before reading them
+
+    """
+    start = time.time()
+    answers = solve(**kwargs)
+    if on_start is not None:
+        on_start(answers)
+    records = tuple(answers._raw_answers())
+    statistics = answers.statistics
+    statistics['Job time'] = time.time() - start
+    return answers.command, records, statistics
+
+
+def run_manifest(manifest:str, out:str, max_workers:int=None,
+                 executor:futures.Executor=None, log:object=sys.stderr) -> dict:
+    """Solve the jobs of given JSON lines manifest, and append one JSON line
+    per job to given output file. Return the counts of solved, failed
+    and skipped jobs, and the total time.
+
+    manifest -- file where each line is a mapping of solve() keyword arguments
+                (files, inline, options, constants…), with an optional 'id'
+                (default to the index of the line)
+    out -- file receiving the results: id, models, optimization, statistics,
+           time and error of each job. Jobs with an id already in it are skipped,
+           allowing to resume an interrupted batch.
+    max_workers, executor -- see solve_many
+    log -- file where progress and throughput are printed, or None
+
+    """
+    done_ids = _result_ids(out)
+    counts = {'solved': 0, 'failed': 0, 'skipped': 0}
+    with open(manifest) as fd:
+        nb_jobs = sum(1 for line in fd if line.strip())
+    def jobs():  # read only when solve_many has room for them
+        with open(manifest) as fd:
+            for idx, line in enumerate(filter(str.strip, fd)):
+                kwargs = json.loads(line)
+                job_id = kwargs.pop('id', idx)
+                if job_id in done_ids:
+                    counts['skipped'] += 1
+                else:
+                    yield job_id, kwargs
+    start = time.time()
+    with open(out, 'a') as fd:
+        for job_id, answers in solve_many(jobs(), max_workers=max_workers, executor=executor):
+            result = _job_result(job_id, answers)
+            counts['failed' if result['error'] else 'solved'] += 1
+            fd.write(json.dumps(result) + '\n')
+            fd.flush()  # the batch may be interrupted
+            if log is not None:
+                nb_done = sum(counts.values())
+                elapsed = time.time() - start
+                print('[{}/{}] job {} {} in {:.2f}s ({:.2f} jobs/s)'.format(
+                    nb_done, nb_jobs, job_id, 'failed' if result['error'] else 'solved',
+                    result['time'], (counts['solved'] + counts['failed']) / elapsed
+                    if elapsed else 0.), file=log)
+    counts['time'] = time.time() - start
+    return counts
+
+
+def _result_ids(out:str) -> set:
+    """Return ids of jobs found in given results file, if it exists,
+    removing the partial last line left by an interrupted batch.
+
+    """
+    if not os.path.exists(out):
+        return set()
+    ids, complete = set(), 0  # size of the complete lines
+    with open(out, 'rb') as fd:
+        for line in fd:
+            if not line.endswith(b'\n'):
+                break
+            complete += len(line)
+            ids.add(json.loads(line.decode())['id'])
+    if complete < os.path.getsize(out):
+        os.truncate(out, complete)
+    return ids
+
+
+def _job_result(job_id:object, answers:Answers or Exception) -> dict:
+    """Return the JSON-serializable result of given job"""
+    if isinstance(answers, Exception):
+        return {'id': job_id, 'models': [], 'optimization': [], 'statistics': {}, 'time': 0.,
+                'error': {'type': type(answers).__name__, 'message': str(answers)}}
+    models, optimizations = [], []
+    for model, optimization in answers.atoms_as_string.with_optimization:
+        models.append(sorted(model))
+        optimizations.append(optimization)
+    statistics = answers.statistics
+    return {'id': job_id, 'models': models, 'optimization': optimizations,
+            'statistics': statistics, 'time': statistics.get('Job time', 0.),
+            'error': None}
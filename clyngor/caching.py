@@ -0,0 +1,151 @@
+"""Content-addressed cache of solver results.
+
+    cache = ResultCache()
+    answers = solve('encoding.lp', inline=facts, cache=cache)
+    print(cache.stats)
+
+Results are keyed by the content of files and inline code, the options
+given to clingo and clingo version, and stored in a SQLite database.
+A hit replays the answers without running the solver.
+
+"""
+
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+from clyngor import utils
+from clyngor.solving import clingo_version
+
+
+class ResultCache:
+    """Cache of the raw answers and statistics of clingo runs,
+    with least recently used entries evicted above a given size.
+
+    """
+
+    def __init__(self, path:str=None, max_size:int=64 * 2**20):
+        """
+        path -- SQLite database file (default in user cache directory)
+        max_size -- maximal size in bytes of the stored results
+
+        """
+        self._path = path or os.path.join(utils.user_cache_dir(), 'results.sqlite')
+        self._max_size = int(max_size)
+        self._lock = threading.Lock()
+        self._versions = {}  # clingo binary -> version string
+        self.hits, self.misses, self.stores, self.evictions = 0, 0, 0, 0
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY,'
+                       ' value TEXT, size INTEGER, last_access REAL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=30)
+
+    @property
+    def path(self) -> str:  return self._path
+
+
+    def key(self, run_commands:iter, files:iter, stdin_feed:str=None,
+            error_on_warning:bool=False) -> str:
+        """Return the key of a clingo run, given its commands,
+        the files in the commands, the data sent to stdin,
+        and whether warnings are raised.
+
+        """
+        files = tuple(files)
+        digest = hashlib.sha256()
+        digest.update(b'error on warning' if error_on_warning else b'')
+        for cmd in run_commands:
+            clingo_bin_path = cmd[0]
+            if clingo_bin_path not in self._versions:
+                self._versions[clingo_bin_path] = json.dumps(
+                    clingo_version(clingo_bin_path), sort_keys=True)
+            digest.update(self._versions[clingo_bin_path].encode())
+            options = cmd[1:len(cmd)-len(files)]
+            digest.update(json.dumps(options).encode())
+        for file in files:
+            if file == '-':
+                content = (stdin_feed or '').encode()
+            else:
+                with open(file, 'rb') as fd:
+                    content = fd.read()
+            digest.update(hashlib.sha256(content).digest())
+        if not files:
+            digest.update(hashlib.sha256((stdin_feed or '').encode()).digest())
+        return digest.hexdigest()
+
+
+    def get(self, key:str) -> (tuple, dict) or None:
+        """Return the raw answers and statistics stored for given key,
+        or None if there is no such entry.
+
+        """
+        with self._lock, self._connect() as db:
+            row = db.execute('SELECT value FROM results WHERE key=?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            db.execute('UPDATE results SET last_access=? WHERE key=?', (time.time(), key))
+        records, statistics = json.loads(row[0])
+        records = tuple((answer, tuple(optimization) if optimization else None)
+                        for answer, optimization in records)
+        return records, statistics
+
+
+    def put(self, key:str, records:iter, statistics:dict):
+        """Store given raw answers and statistics under given key,
+        then evict the least recently used entries if the cache is too big.
+
+        """
+        value = json.dumps((tuple(records), statistics))
+        with self._lock, self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                       (key, value, len(value), time.time()))
+            self.stores += 1
+            size = db.execute('SELECT TOTAL(size) FROM results').fetchone()[0]
+            while size > self._max_size:
+                oldest, oldest_size = db.execute('SELECT key, size FROM results'
+                                                 ' ORDER BY last_access LIMIT 1').fetchone()
+                db.execute('DELETE FROM results WHERE key=?', (oldest,))
+                size -= oldest_size
+                self.evictions += 1
+
+
+    def recorded(self, key:str, answers:iter, statistics:dict,
+                 complete:callable=None) -> iter:
+        """Yield given raw answers, and store them once all have been
+        successfully generated.
+
+        complete -- if given, called after the generation, the answers
+                    being stored only if it returns True
+
+        """
+        records = []
+        for record in answers:
+            records.append(record)
+            yield record
+        if complete is None or complete():
+            self.put(key, records, statistics)
+
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock, self._connect() as db:
+            db.execute('DELETE FROM results')
+
+    @property
+    def stats(self) -> dict:
+        """Counters and size of the cache"""
+        with self._lock, self._connect() as db:
+            entries, size = db.execute('SELECT COUNT(*), TOTAL(size) FROM results').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores,
+                'evictions': self.evictions, 'entries': entries, 'size': int(size)}
+
+    def __repr__(self):
+        return '<ResultCache {} {}>'.format(self._path, self.stats)
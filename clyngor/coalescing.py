@@ -0,0 +1,165 @@
+"""Single-flight coalescing of identical concurrent solvings.
+
+When many threads ask for the same solving at the same time, only the first
+one runs clingo. The others join its flight: each one gets its own Answers,
+iterating over the models as they are read from the shared clingo.
+
+    answers = solve('encoding.lp', inline=instance, coalesce=True)
+
+Calls made after the end of the run start a new one.
+
+"""
+
+
+import threading
+
+from clyngor.answers import Answers
+
+
+class Coalescer:
+    """Registry of the running flights, keyed by the normalized inputs
+    of the solving: commands, standard input and error handling.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> _Flight
+        self.leaders, self.followers = 0, 0
+
+    @property
+    def running(self) -> int:
+        """Number of flights currently running"""
+        with self._lock:
+            return len(self._flights)
+
+
+    def flight(self, key:tuple) -> ('_Flight', bool):
+        """Return the flight of given key, and True if the caller
+        must run clingo and give its answers to _Flight.take_off.
+
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(self, key)
+                self.leaders += 1
+                return flight, True
+            flight.users += 1
+            self.followers += 1
+            return flight, False
+
+
+    def _land(self, flight:'_Flight'):
+        """Forget given flight: next calls will start a new one"""
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def __repr__(self):
+        return '<Coalescer running={} leaders={} followers={}>'.format(
+            self.running, self.leaders, self.followers)
+
+
+class _Flight:
+    """A clingo run shared by many Answers.
+
+    Records are pulled from the leader answers when a follower needs one
+    that is not yet in the shared buffer.
+    The solver is stopped when all followers are closed or garbage collected.
+
+    """
+
+    def __init__(self, coalescer:Coalescer, key:tuple):
+        self._coalescer = coalescer
+        self.key = key
+        self.users = 1  # the leader
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._answers, self._source = None, None
+        self._records = []
+        self._done, self._error = False, None
+
+    def take_off(self, answers:Answers) -> Answers:
+        """Share given answers, and return the leader's follower"""
+        self._answers, self._source = answers, answers._raw_answers()
+        self._ready.set()
+        return self.follower()
+
+    def abort(self, error:BaseException):
+        """Make followers raise given error, since no clingo is running"""
+        self._error, self._done = error, True
+        self._coalescer._land(self)
+        self._ready.set()
+
+
+    def follower(self) -> Answers:
+        """Return a new Answers over the records of the flight"""
+        self._ready.wait()
+        if self._answers is None:  # leader failed to run clingo
+            raise self._error
+        return Answers(self._follow(), command=self._answers.command,
+                       statistics=self._answers._statistics,
+                       progression=self._answers._progression,
+                       with_optimization=True, on_close=self._leave)
+
+
+    def _follow(self) -> iter:
+        """Yield all records, pulling them from the solver when necessary"""
+        index = 0
+        while True:
+            with self._lock:
+                if index == len(self._records):
+                    if self._done:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    try:
+                        self._records.append(next(self._source))
+                    except StopIteration:
+                        self._land()
+                        continue
+                    except Exception as err:
+                        self._error = err
+                        self._land()
+                        raise
+                record = self._records[index]
+            index += 1
+            yield record
+
+
+    def _land(self):
+        self._done = True
+        self._coalescer._land(self)
+
+
+    def _leave(self):
+        """Called when a follower is closed or collected ;
+        the last one stops the solver.
+
+        """
+        with self._coalescer._lock:
+            self.users -= 1
+            last = self.users == 0
+            if last:  # no one can join anymore
+                if self._coalescer._flights.get(self.key) is self:
+                    del self._coalescer._flights[self.key]
+        if last:
+            with self._lock:
+                self._done = True
+                self._answers.close()
+
+
+_GLOBAL_COALESCER = None
+_GLOBAL_LOCK = threading.Lock()
+
+def global_coalescer() -> Coalescer:
+    """Return the coalescer shared by the whole process,
+    used by solve(coalesce=True).
+
+    """
+    global _GLOBAL_COALESCER
+    with _GLOBAL_LOCK:
+        if _GLOBAL_COALESCER is None:
+            _GLOBAL_COALESCER = Coalescer()
+        return _GLOBAL_COALESCER
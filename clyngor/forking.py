@@ -0,0 +1,200 @@
+"""Fork-server solving many instances of one large encoding.
+
+The encoding is loaded and parsed once by the python clingo module,
+in this process. Each instance is then solved in a forked child,
+sharing the loaded encoding by copy-on-write, and streaming its models
+back through a pipe.
+
+    with ForkServer('encoding.lp', options='--opt-mode=optN') as server:
+        for instance in instances:
+            print(tuple(server.solve(inline=instance).by_predicate))
+
+Needs the python clingo module, and os.fork (hence not available on windows).
+
+"""
+
+
+import os
+import signal
+import multiprocessing
+from multiprocessing.connection import Connection
+
+import clyngor
+from clyngor.answers import Answers
+from clyngor.utils import cleaned_path
+from clyngor.parsing import validate_clasp_stderr
+from clyngor.solving import _stderr_error
+from clyngor.propagators import Main
+
+
+class ForkServer:
+    """Clingo Control loaded with an encoding, forked for each solving.
+
+    The Control of the server is never grounded: only the children are.
+
+    """
+
+    def __init__(self, files:iter=(), inline:str=None, options:iter=[],
+                 nb_model:int=0, clean_path:bool=True,
+                 programs:iter=(['base', ()],), propagators:iter=(),
+                 grounding_observers:iter=()):
+        """
+        files -- iterable of files of the encoding
+        inline -- ASP source code of the encoding
+        options -- string or iterable of options for clingo
+        nb_model, clean_path, programs, propagators, grounding_observers --
+            same as solving.solve, used for each instance
+
+        """
+        if not clyngor.have_clingo_module():
+            raise ImportError("ForkServer needs the python clingo module.")
+        if not hasattr(os, 'fork'):
+            raise NotImplementedError("ForkServer needs os.fork, not available on this platform.")
+        files = [files] if isinstance(files, str) else files
+        files = tuple(map(cleaned_path, files) if clean_path else files)
+        options = options.split() if isinstance(options, str) else list(options)
+        self._messages = []  # clingo messages, reported in case of error
+        self._ctl = clyngor.clingo_module.Control(
+            options, logger=lambda code, message: self._messages.append(message))
+        try:
+            for file in files:
+                self._ctl.load(file)
+            if inline:
+                self._ctl.add('base', [], inline)
+        except RuntimeError as err:
+            raise _clingo_error(self._messages, err) from None
+        self._command = 'fork-server ' + ' '.join(options + list(files))
+        self._nb_model = nb_model
+        self._clean_path = bool(clean_path)
+        self._programs = programs
+        self._propagators = propagators
+        self._observers = grounding_observers
+        self._closed = False
+        self.forks = 0
+
+
+    def solve(self, files:iter=(), inline:str=None) -> Answers:
+        """Return the Answers of the encoding with given instance,
+        solved in a forked child.
+
+        files -- iterable of files of the instance
+        inline -- ASP source code of the instance
+
+        """
+        if self._closed:
+            raise ValueError("Solving on a closed ForkServer.")
+        files = [files] if isinstance(files, str) else files
+        files = tuple(map(cleaned_path, files) if self._clean_path else files)
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        pid = os.fork()
+        if pid == 0:  # child: never returns
+            reader.close()
+            self._run_child(writer, files, inline)
+        writer.close()
+        self.forks += 1
+        child, statistics = _Child(pid, reader), {}
+        return Answers(_gen_answers(child, statistics),
+                       command=self._command, statistics=statistics,
+                       with_optimization=True, on_close=child.kill)
+
+
+    def _run_child(self, writer:Connection,
+                   files:tuple, inline:str or None):
+        """Ground and solve the instance, send the results through given pipe,
+        then exit.
+
+        """
+        status = 0
+        try:
+            main = Main(files=files, inline=inline, nb_model=self._nb_model,
+                        propagators=self._propagators, observers=self._observers,
+                        programs=self._programs, generator=True)
+            answers = main(self._ctl)
+            for record in answers._raw_answers():
+                writer.send(('answer', record))
+            writer.send(('statistics', answers.statistics))
+            writer.send(('end', None))
+        except BaseException as err:
+            status = 1
+            if isinstance(err, RuntimeError):
+                err = _clingo_error(self._messages, err)
+            try:
+                writer.send(('error', err))
+            except Exception:  # not picklable, or pipe closed by parent
+                pass
+        finally:
+            writer.close()
+            os._exit(status)  # no cleanup of the parent's state
+
+
+    def close(self):
+        """Forget the loaded encoding. No more solving is possible."""
+        self._closed = True
+        self._ctl = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self):
+        return '<ForkServer forks={}{}>'.format(self.forks, ' closed' if self._closed else '')
+
+
+def _clingo_error(messages:list, error:RuntimeError) -> Exception:
+    """Return the exception describing the clingo failure, as raised
+    by solving.solve, or given error if messages are not explicit.
+
+    """
+    lines = iter('\n'.join(messages).splitlines())
+    for payload in validate_clasp_stderr(lines):
+        found = _stderr_error(payload, error_on_warning=False)
+        if found is not None:
+            return found
+    return error
+
+
+class _Child:
+    """A forked child, with the pipe sending its results"""
+
+    def __init__(self, pid:int, reader:Connection):
+        self.pid, self.reader = pid, reader
+        self._reaped = False
+
+    def kill(self):
+        """Kill the child if still running, and reap it, once"""
+        self.reader.close()
+        if self._reaped:  # its pid may be reused
+            return
+        self._reaped = True
+        try:
+            if os.waitpid(self.pid, os.WNOHANG) == (0, 0):  # still running
+                os.kill(self.pid, signal.SIGKILL)
+                os.waitpid(self.pid, 0)
+        except ChildProcessError:  # already reaped
+            pass
+
+
+def _gen_answers(child:_Child, statistics:dict) -> iter:
+    """Yield (answer set, optimization) received from given child,
+    and update given statistics dict with the statistics of the solving.
+
+    """
+    try:
+        while True:
+            try:
+                kind, payload = child.reader.recv()
+            except EOFError:
+                raise ChildProcessError("Fork-server child {} died without "
+                                        "finishing its solving".format(child.pid))
+            if kind == 'answer':
+                yield tuple(payload)
+            elif kind == 'statistics':
+                statistics.update(payload)
+            elif kind == 'error':
+                raise payload
+            else:  # end
+                break
+    finally:
+        child.kill()
@@ -42,8 +42,8 @@ def ASP_one_model(source_code:str, **kwargs):
     kwargs -- keyword arguments to be given to solve() call
 
     """
-    models = solve(inline=source_code, stats=False, nb_model=1, **kwargs)
-    return next(models, None)
+    with solve(inline=source_code, stats=False, nb_model=1, **kwargs) as models:
+        return next(models, None)
 
 
 # shortcuts
@@ -2,12 +2,17 @@
 
 """
 import re
+import functools
 
 
-import arpeggio as ap
+def _load_arpeggio():
+    """Import arpeggio, needed only by the Parser class, as global ap"""
+    global ap
+    import arpeggio as ap
+    return ap
 
 
-class CollapsableAtomVisitor(ap.PTNodeVisitor):
+class _CollapsableAtomVisitor:
     """Implement both the grammar and the way to handle it, dedicated to the
     parsing of ASP like string to produce frozenset instances.
 
@@ -70,6 +75,22 @@ class CollapsableAtomVisitor(ap.PTNodeVisitor):
         return terms
 
 
+@functools.lru_cache(maxsize=None)
+def _collapsable_atom_visitor() -> type:
+    """Return the CollapsableAtomVisitor class, made once arpeggio is imported"""
+    _load_arpeggio()
+    return type('CollapsableAtomVisitor', (_CollapsableAtomVisitor, ap.PTNodeVisitor),
+                {'__module__': __name__, '__doc__': _CollapsableAtomVisitor.__doc__})
+
+
+def __getattr__(name:str) -> object:
+    if name == 'CollapsableAtomVisitor':
+        return _collapsable_atom_visitor()
+    if name == 'ap':
+        return _load_arpeggio()
+    raise AttributeError("module {} has no attribute {}".format(repr(__name__), repr(name)))
+
+
 class Parser:
     def __init__(self, collapse_atoms=False, collapse_args=True, callback=None,
                  parse_integer:bool=True):
@@ -107,7 +128,7 @@ class Parser:
         """
         self.collapse_args = bool(collapse_args)
         self.collapse_atoms = bool(collapse_atoms)
-        self.atom_visitor = CollapsableAtomVisitor(
+        self.atom_visitor = _collapsable_atom_visitor()(
             bool(collapse_args),
             bool(collapse_atoms),
             parse_integer
@@ -155,7 +176,9 @@ def parse_clasp_output(output:iter or str, *, yield_stats:bool=False,
 
     output -- iterable of lines or full clasp output to parse
     yield_stats -- yields final statistics as a mapping {field: value}
-                   under type 'statistics'
+                   under type 'statistics'. Statistics of each thread,
+                   if any, are given as a list of such mappings
+                   under field 'Thread Stats'.
     yield_opti  -- yields line sometimes following an answer set,
                    beginning with 'Optimization: '.
     yield_info  -- yields all lines not included in other types, including the
@@ -173,13 +196,20 @@ def parse_clasp_output(output:iter or str, *, yield_stats:bool=False,
     output = iter(output.splitlines() if isinstance(output, str) else output)
 
     # get the first lines
-    line = next(output)
+    line = next(output, None)
+    if line is None:  # no output at all
+        return
     infos = []
     while not line.startswith(ASW_FLAG):
-        infos.append(line)
+        if line.startswith(PROGRESS) and yield_prgs:  # core-guided optimization
+            yield 'progression', line[len(PROGRESS):].strip()
+        else:
+            infos.append(line)
         try:
             line = next(output)
-        except StopIteration:
+        except StopIteration:  # no answer at all
+            if yield_info:
+                yield 'info', tuple(infos)
             return
 
     # first answer begins
@@ -192,11 +222,17 @@ def parse_clasp_output(output:iter or str, *, yield_stats:bool=False,
             yield 'progression', line[len(PROGRESS):].strip()
         elif not line.strip():  # empty line: statistics are beginning
             if not yield_stats: break  # stats are the last part of the output
-            stats = {}
+            stats = current = {}
             for line in output:
+                thread = REG_THREAD.fullmatch(line.strip())
+                if thread:  # statistics of a particular thread are beginning
+                    current = {}
+                    stats.setdefault('Thread Stats', []).append(current)
                 sep = line.find(':')
+                if sep == -1:  # empty line or header
+                    continue
                 key, value = line[:sep], line[sep+1:]
-                stats[key.strip()] = value.strip()
+                current[key.strip()] = value.strip()
             yield 'statistics', stats
             break
         else:  # should not happen
@@ -210,6 +246,40 @@ def parse_clasp_output(output:iter or str, *, yield_stats:bool=False,
         yield 'info', tuple(infos)
 
 parse_clasp_output.out_types = ('info', 'answers', 'optimization, ''statistics')  # the order is the one in clingo input
+REG_THREAD = re.compile(r'\[Thread ([0-9]+)\]')
+
+
+def parse_progression(progression:str) -> dict:
+    """Return the bounds and error found in given progression payload,
+    as yielded by parse_clasp_output.
+
+    >>> parse_progression('[   2;3299] (Error: 1648.5)')
+    {'lower': (2,), 'upper': (3299,), 'error': 1648.5}
+    >>> parse_progression('[1 4;inf]')
+    {'lower': (1, 4), 'upper': (inf,), 'error': None}
+    >>> parse_progression('[   -92;inf] (Time: 0.001s)')
+    {'lower': (-92,), 'upper': (inf,), 'error': None}
+
+    """
+    match = REG_PROGRESSION.fullmatch(progression.strip())
+    if not match:
+        raise ValueError("Unexpected progression: " + repr(progression))
+    lower, upper, details = match.groups()
+    error = REG_PROGRESSION_ERROR.search(details or '')
+    return {
+        'lower': _parse_bound(lower),
+        'upper': _parse_bound(upper),
+        'error': float(error.group(1)) if error else None,
+    }
+
+REG_PROGRESSION = re.compile(r'\[([^;\]]*);([^\]]*)\]\s*(?:\((.*)\))?')
+REG_PROGRESSION_ERROR = re.compile(r'Error:\s*([^\s)]+)')
+
+
+def _parse_bound(bound:str) -> tuple:
+    """Tuple of integers in given bound, or floats for infinite values"""
+    return tuple(int(value) if value.lstrip('-').isdigit() else float(value)
+                 for value in bound.split())
 
 
 def validate_clasp_stderr(stderr:iter or str) -> iter:
@@ -0,0 +1,183 @@
+"""Enumeration of all models by many clingo runs, on disjoint parts
+of the search space.
+
+A few atoms of the program are chosen, and each run gets a cube:
+an assignment of some of them, enforced by constraints. The cubes are
+disjoint and cover all assignments, hence each model is found by exactly
+one run, and the streams are merged without deduplication.
+
+    answers = solve('encoding.lp', enumerate_parallel=4)
+
+"""
+
+
+import queue
+import threading
+
+import clyngor
+from clyngor.answers import Answers
+from clyngor.solving import solve
+
+
+def cubes(nb:int, atoms:iter) -> list:
+    """Return nb disjoint cubes covering all assignments of given atoms,
+    as lists of (atom, truth value). Only the atoms needed are used.
+
+    >>> cubes(3, 'abc')
+    [[('a', True), ('b', True)], [('a', True), ('b', False)], [('a', False)]]
+    >>> cubes(1, 'abc')
+    [[]]
+
+    """
+    atoms = list(atoms)
+    if nb > 2 ** len(atoms):
+        raise ValueError("{} atoms can't make {} cubes.".format(len(atoms), nb))
+    if nb == 1:
+        return [[]]
+    atom, others = atoms[0], atoms[1:]
+    return ([[(atom, True)] + cube for cube in cubes((nb + 1) // 2, others)]
+            + [[(atom, False)] + cube for cube in cubes(nb // 2, others)])
+
+
+def _cube_constraints(cube:list) -> str:
+    """Return the constraints enforcing given cube
+
+    >>> _cube_constraints([('p(1)', True), ('q', False)])
+    ':- not p(1). :- q.'
+
+    """
+    return ' '.join(':- {}{}.'.format('not ' if value else '', atom)
+                    for atom, value in cube)
+
+
+def partition_atoms(nb:int, files:iter=(), inline:str=None, constants:dict={},
+                    programs:iter=(['base', ()],)) -> list:
+    """Return nb atoms of the grounded program that are heads of choice rules,
+    hence undetermined, found through the python clingo module.
+
+    The atoms are evenly spread over the sorted list of candidates,
+    so they tend to describe independent parts of the problem.
+
+    """
+    if not clyngor.have_clingo_module():
+        raise ImportError("Choosing the partition atoms needs the python clingo module. "
+                          "Give them explicitely with partition_atoms option.")
+    options = ['--warn=none'] + ['--const={}={}'.format(name, value)
+                                 for name, value in constants.items()]
+    ctl = clyngor.clingo_module.Control(options)
+    observer = _ChoiceObserver()
+    ctl.register_observer(observer)
+    for file in files:
+        ctl.load(file)
+    if inline:
+        ctl.add('base', [], inline)
+    ctl.ground([(name, list(args)) for name, args in programs])
+    atoms = sorted(str(atom.symbol) for atom in ctl.symbolic_atoms
+                   if atom.literal in observer.heads and not atom.is_fact)
+    if len(atoms) <= nb:
+        return atoms
+    return [atoms[idx * len(atoms) // nb] for idx in range(nb)]
+
+
+class _ChoiceObserver:
+    """Grounding observer collecting the literals in heads of choice rules"""
+
+    def __init__(self):
+        self.heads = set()
+
+    def rule(self, choice:bool, head:list, body:list):
+        if choice:
+            self.heads.update(head)
+
+    def weight_rule(self, choice:bool, head:list, lower_bound:int, body:list):
+        if choice:
+            self.heads.update(head)
+
+
+def solve_partitioned(nb:int, atoms:iter=None, nb_model:int=0, inline:str=None,
+                      **kwargs) -> Answers:
+    """Return the Answers merging the models found by nb clingo runs,
+    each one on its own cube of the search space.
+
+    nb -- number of concurrent runs
+    atoms -- atoms used to make the cubes (default to atoms found by partition_atoms)
+    nb_model -- maximal number of models, or 0 for all
+    inline, kwargs -- parameters of solve(), given to each run
+
+    Statistics give the total number of 'Models', the statistics of each run
+    under 'Worker Stats', and the constraints of the cubes under 'Partition'.
+
+    """
+    nb_atoms = (nb - 1).bit_length()  # enough to make nb cubes
+    if atoms is None:
+        atoms = partition_atoms(nb_atoms, kwargs.get('files', ()), inline,
+                                kwargs.get('constants') or {},
+                                kwargs.get('programs', (['base', ()],)))
+    atoms = list(atoms)
+    if len(atoms) < nb_atoms:  # few atoms to decide: less runs are needed
+        nb = 2 ** len(atoms)
+    partition = [_cube_constraints(cube) for cube in cubes(nb, atoms)]
+    workers = [solve(inline=(inline or '') + '\n' + constraints, nb_model=0,
+                     use_clingo_module=False, **kwargs)
+               for constraints in partition]
+    statistics = {'Partition': partition}
+    return Answers(_merged(workers, statistics, int(nb_model or 0)),
+                   command=' & '.join(worker.command for worker in workers),
+                   statistics=statistics, with_optimization=True,
+                   on_close=lambda: _stop(workers))
+
+
+def _stop(workers:list):
+    for worker in workers:
+        worker._interrupt()
+
+
+def _merged(workers:list, statistics:dict, nb_model:int) -> iter:
+    """Yield (answer set, optimization) of given workers as soon as found,
+    and update given statistics once all workers are done.
+
+    """
+    stop = threading.Event()
+    records = queue.Queue(maxsize=64 * len(workers))
+    def read(worker):
+        try:
+            for record in worker._raw_answers():
+                if not _put(records, stop, ('answer', record)):
+                    return
+        except Exception as err:
+            _put(records, stop, ('error', err))
+        finally:
+            _put(records, stop, ('end', None))
+    for worker in workers:
+        threading.Thread(target=read, args=(worker,), daemon=True).start()
+    running, yielded = len(workers), 0
+    try:
+        while running:
+            kind, payload = records.get()
+            if kind == 'answer':
+                yield payload
+                yielded += 1
+                if yielded == nb_model:
+                    break
+            elif kind == 'error':
+                raise payload
+            else:
+                running -= 1
+    finally:
+        stop.set()
+        _stop(workers)
+    worker_stats = [worker.statistics for worker in workers]
+    statistics['Worker Stats'] = worker_stats
+    statistics['Models'] = str(sum(int(stats.get('Models', '0').rstrip('+') or 0)
+                                   for stats in worker_stats))
+
+
+def _put(records:queue.Queue, stop:threading.Event, item:tuple) -> bool:
+    """Put given item in given queue, unless stop is set first"""
+    while not stop.is_set():
+        try:
+            records.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
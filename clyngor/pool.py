@@ -0,0 +1,126 @@
+"""Pool of clingo processes spawned in advance.
+
+Spawning the clingo binary is the main cost of solving a small program.
+A ClingoPool keeps some clingo processes alive, all sharing the same
+command, waiting for their program on stdin.
+
+    pool = ClingoPool(4, options='--opt-mode=optN', nb_model=0)
+    answers = solve(inline='a;b.', options='--opt-mode=optN', pool=pool)
+
+"""
+
+
+import threading
+import subprocess
+from collections import deque
+
+from clyngor import solving
+
+
+class ClingoPool:
+    """Bounded collection of idle clingo processes waiting for stdin input.
+
+    Processes are handed to solve() when the command it would run is
+    the same as the pool one. Each handed process is replaced in background.
+
+    """
+
+    def __init__(self, size:int=4, options:iter=[], nb_model:int=0,
+                 time_limit:int=0, constants:dict={}, stats:bool=True,
+                 clingo_bin_path:str=None):
+        """
+        size -- maximal number of idle processes kept alive
+        options, nb_model, constants, stats, clingo_bin_path --
+            same as solving.command, defining the command shared by all processes
+        time_limit -- must be 0: a time limit would elapse while processes are idle
+
+        """
+        if int(size) < 1:
+            raise ValueError("Pool size must be >= 1, not {}.".format(size))
+        self._size = int(size)
+        self._command = solving.command((), options, None, nb_model, time_limit,
+                                        constants, stats,
+                                        clingo_bin_path=clingo_bin_path)
+        if any(arg.startswith('--time-limit') for arg in self._command):
+            raise ValueError("Pooled clingo processes can't have a time limit, "
+                             "since it would elapse while they are idle.")
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.hits, self.misses = 0, 0
+        for _ in range(self._size):
+            self._spawn()
+
+    @property
+    def command(self) -> list:  return list(self._command)
+
+    @property
+    def size(self) -> int:  return self._size
+
+    @property
+    def idle(self) -> int:
+        """Number of processes currently waiting for a program"""
+        with self._lock:
+            return len(self._idle)
+
+
+    def acquire(self, run_command:list) -> subprocess.Popen or None:
+        """Return an idle clingo process running given command,
+        or None if there is no such process available.
+
+        The returned process is replaced in background.
+
+        """
+        process, removed = None, 0
+        with self._lock:
+            if not self._closed and list(run_command) == self._command:
+                while self._idle and process is None:
+                    process = self._idle.popleft()
+                    removed += 1
+                    if process.poll() is not None:  # died while waiting
+                        solving._kill(process)  # release its pipes
+                        process = None
+            if process is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        for _ in range(removed):  # replace the handed and the dead processes
+            threading.Thread(target=self._spawn, daemon=True).start()
+        return process
+
+
+    def _spawn(self):
+        """Add a new clingo process to the idle ones, if there is room for it"""
+        with self._lock:
+            if self._closed or len(self._idle) >= self._size:
+                return
+        process = solving._ClingoProcess(
+            self._command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        with self._lock:
+            if not self._closed and len(self._idle) < self._size:
+                self._idle.append(process)
+                return
+        solving._kill(process)  # pool closed or full in the meantime
+
+
+    def close(self):
+        """Kill all idle processes. The pool will not spawn anymore."""
+        with self._lock:
+            self._closed = True
+            processes, self._idle = tuple(self._idle), deque()
+        for process in processes:
+            solving._kill(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self):
+        return '<ClingoPool size={} idle={} hits={} misses={}>'.format(
+            self._size, self.idle, self.hits, self.misses)
@@ -4,9 +4,7 @@ Exposes Main, Constraint and Variable.
 
 """
 
-import os
 import math
-import tempfile
 from collections import defaultdict
 from . import utils
 from .answers import ClingoAnswers
@@ -14,7 +12,8 @@ from .answers import ClingoAnswers
 
 def Main(files:iter=(), inline:str='', nb_model:int=0,
          propagators:iter or object=(), observers:iter or object=(),
-         programs:iter or dict={'base': ()}, generator:bool=False):
+         programs:iter or dict={'base': ()}, generator:bool=False,
+         checkpoint:str=None, checkpoint_every:int=100):
     """Main function builder for clingo.
 
     Allow user to use:
@@ -38,6 +37,9 @@ def Main(files:iter=(), inline:str='', nb_model:int=0,
     generator -- the main function will return a ClingoAnswers instance instead
                  of returning the solve call result
     nb_model -- number of model to search for. 0 stands for all.
+    checkpoint -- file where the ClingoAnswers instance saves the models,
+                  and from which it resumes the enumeration.
+    checkpoint_every -- number of models found between two saves
 
     """
     if not isinstance(propagators, (tuple, list, set, frozenset)):
@@ -49,18 +51,12 @@ def Main(files:iter=(), inline:str='', nb_model:int=0,
         (prg, list(args)) for prg, args
         in (programs.items() if isinstance(programs, dict) else programs)
     )
-    if inline:
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as fd:
-            fd.write(inline)
-            tempfile_to_del = fd.name
-            files = tuple(files) + (tempfile_to_del,)
-            assert files, fd.name
 
     def main(prg):
         for file in files:
             prg.load(file)
-        if inline and tempfile_to_del:  # remove the tempfile after the work.
-            os.remove(tempfile_to_del)
+        if inline:
+            prg.add('base', [], inline)
         for observer in observers:
             prg.register_observer(observer)
         for propagator in propagators:
@@ -68,7 +64,8 @@ def Main(files:iter=(), inline:str='', nb_model:int=0,
         prg.ground(programs)
         prg.configuration.solve.models = nb_model
         if generator:
-            return ClingoAnswers(prg)
+            return ClingoAnswers(prg, checkpoint=checkpoint,
+                                 checkpoint_every=checkpoint_every)
         prg.solve()
     return main
 
@@ -0,0 +1,172 @@
+"""Distribution of solving jobs over remote workers.
+
+On each node, a worker listens on a TCP port:
+
+    python -m clyngor worker --listen 0.0.0.0:8451 --workers 4
+
+and the coordinator gives the jobs to them through solve_many:
+
+    executor = RemoteExecutor(['node1:8451', 'node2:8451'])
+    for job_id, answers in solve_many(jobs, executor=executor):
+        print(job_id, tuple(answers.by_predicate))
+
+Jobs are sent with the content of their files, hence the workers need
+no shared filesystem. Answers are streamed back with the JSON lines protocol
+of the daemon (see serving module).
+The protocol is neither authenticated nor encrypted:
+workers must listen on a trusted network only.
+
+"""
+
+
+import os
+import time
+import queue
+import tempfile
+import socketserver
+from concurrent import futures
+
+from clyngor import serving, batching
+from clyngor.answers import Answers
+
+
+# solve() parameters that can be given to a worker,
+#  files being replaced by sources, the pairs (file name, content)
+WORKER_PARAMETERS = (serving.SOLVE_PARAMETERS - {'files', 'clean_path'}) | {'sources'}
+
+
+def parse_address(address:str or tuple) -> tuple:
+    """Return the pair (host, port) described by given address
+
+    >>> parse_address('localhost:8451')
+    ('localhost', 8451)
+    >>> parse_address('[::1]:8451')
+    ('::1', 8451)
+    >>> parse_address(('node', '12'))
+    ('node', 12)
+
+    """
+    if isinstance(address, str):
+        host, sep, port = address.rpartition(':')
+        if not sep:
+            raise ValueError("Address must be of the form host:port, not {}.".format(repr(address)))
+        address = host.strip('[]'), port
+    host, port = address
+    return host, int(port)
+
+
+class SolvingWorker(serving._SolvingMixIn, socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Worker solving the jobs received on a TCP port"""
+    allow_reuse_address = True
+    parameters = WORKER_PARAMETERS
+
+    def __init__(self, address:str or tuple, workers:int=4, timeout:float=None):
+        """
+        address -- pair (host, port) or string host:port to listen on.
+                   Port 0 makes the system choose a free port.
+        workers, timeout -- see serving._SolvingMixIn
+
+        """
+        super().__init__(parse_address(address), workers, timeout)
+
+    @property
+    def address(self) -> tuple:
+        """Pair (host, port) the worker is listening on"""
+        return self.server_address[:2]
+
+
+    def _solve(self, kwargs:dict, send:callable):
+        """Write the sources in a temporary directory, and solve them"""
+        sources = kwargs.pop('sources', ())
+        with tempfile.TemporaryDirectory(prefix='clyngor-worker-') as tmpdir:
+            files = []
+            for idx, (name, content) in enumerate(sources):
+                # one directory per file, keeping names in clingo messages
+                path = os.path.join(tmpdir, str(idx), os.path.basename(name))
+                os.makedirs(os.path.dirname(path))
+                with open(path, 'w') as fd:
+                    fd.write(content)
+                files.append(path)
+            kwargs['files'] = files
+            kwargs['clean_path'] = False
+            super()._solve(kwargs, send)
+
+
+def work(address:str or tuple, workers:int=4, timeout:float=None):
+    """Run a worker until interrupted"""
+    with SolvingWorker(address, workers, timeout) as worker:
+        try:
+            worker.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def solve_remotely(address:str or tuple, files:iter=(), **kwargs) -> Answers:
+    """Return the Answers computed by the worker at given address,
+    for given solve() parameters. The given files are read and sent to it.
+
+    """
+    address = parse_address(address)
+    files = [files] if isinstance(files, str) else files
+    sources = []
+    for file in files:
+        with open(file) as fd:
+            sources.append((file, fd.read()))
+    sock, response = serving._connect(address, {'type': 'solve', 'kwargs': dict(kwargs, sources=sources)})
+    statistics = {}
+    return Answers(serving._gen_answers(response, statistics),
+                   command='clyngor worker at {}:{}'.format(*address),
+                   statistics=statistics, with_optimization=True,
+                   on_close=lambda: (response.close(), sock.close()))
+
+
+class RemoteExecutor(futures.Executor):
+    """Executor running the jobs of solve_many on remote workers.
+
+    Each worker is given at most `slots` jobs at once. A job is given
+    to the first worker with a free slot.
+
+    """
+
+    def __init__(self, addresses:iter, slots:int=1):
+        """
+        addresses -- addresses of the workers, as string host:port or pairs
+        slots -- number of jobs given at once to each worker, usually the
+                 number of workers of the remote SolvingWorker
+
+        """
+        addresses = tuple(map(parse_address, addresses))
+        if not addresses or int(slots) < 1:
+            raise ValueError("At least one worker with one slot is needed.")
+        self._free = queue.Queue()  # addresses of the free slots
+        for _ in range(int(slots)):
+            for address in addresses:
+                self._free.put(address)
+        self._threads = futures.ThreadPoolExecutor(len(addresses) * int(slots))
+        self.addresses = addresses
+
+
+    def submit(self, fn:callable, *args, **kwargs) -> futures.Future:
+        """Only solve_many jobs can be run remotely"""
+        if fn is not batching._run_job:
+            raise TypeError("RemoteExecutor only runs solving jobs of solve_many.")
+        return self._threads.submit(self._run_job, *args, **kwargs)
+
+
+    def _run_job(self, kwargs:dict) -> (str, tuple, dict):
+        """Same as batching._run_job, on the first free worker"""
+        address = self._free.get()
+        try:
+            start = time.time()
+            answers = solve_remotely(address, **kwargs)
+            records = tuple(answers._raw_answers())
+            statistics = answers.statistics
+            statistics['Job time'] = time.time() - start
+            statistics['Worker'] = '{}:{}'.format(*address)
+            return answers.command, records, statistics
+        finally:
+            self._free.put(address)
+
+
+    def shutdown(self, wait:bool=True, **kwargs):
+        self._threads.shutdown(wait=wait)
@@ -0,0 +1,105 @@
+"""Sampling of a few diverse answer sets in a large space of models.
+
+The models enumerated by a single clingo run are close neighbors.
+Instead, many clingo runs are made in parallel, each with its own random
+seed, frequency of random decisions and random sign heuristic,
+and only their first models are kept:
+
+    for model in sample(5, 'encoding.lp', seed=42):
+        print(model)
+
+"""
+
+
+import random
+import weakref
+import threading
+from concurrent import futures
+
+from clyngor.answers import Answers
+from clyngor.batching import solve_many
+
+
+def sample(k:int, files:iter=(), inline:str=None, options:iter=[],
+           seed:int=None, max_workers:int=None, models_per_run:int=1,
+           max_runs:int=None, **kwargs) -> Answers:
+    """Return Answers yielding k distinct models, or less if the runs
+    ended without finding that many.
+
+    k -- number of distinct models to return
+    files, inline, options -- see solve()
+    seed -- seed of the random generator giving the settings of each run.
+            With a given seed, the same models are returned.
+    max_workers -- number of clingo runs made in parallel
+    models_per_run -- number of models asked to each run
+    max_runs -- maximal number of runs (default to 10 times k)
+    kwargs -- other parameters of solve(), given to each run
+
+    Statistics give the number of 'Sampling runs' made, and the number
+    of 'Duplicated models' found by them.
+
+    """
+    k = int(k)
+    if k < 1:
+        raise ValueError("At least one model must be sampled, not {}.".format(k))
+    max_runs = int(max_runs or 10 * k)
+    rng = random.Random(seed)
+    options = options.split() if isinstance(options, str) else list(options)
+    def jobs():
+        for _ in range(max_runs):
+            yield dict(kwargs, files=files, inline=inline, nb_model=models_per_run,
+                       use_clingo_module=False,
+                       options=options + ['--seed={}'.format(rng.randrange(2**31)),
+                                          '--rand-freq={:.2f}'.format(rng.uniform(0.05, 0.5)),
+                                          '--sign-def=rnd'])
+    samples, seen = [], set()
+    statistics = {'Sampling runs': 0, 'Duplicated models': 0}
+    command = None
+    running = weakref.WeakSet()  # Answers of the runs in flight
+    stopped, lock = threading.Event(), threading.Lock()
+    def on_start(answers):  # called in the worker thread
+        with lock:
+            running.add(answers)
+            if stopped.is_set():  # started after the end of the sampling
+                answers._interrupt()
+    with futures.ThreadPoolExecutor(max_workers) as executor:  # clingo runs in subprocesses
+        runs = solve_many(jobs(), max_workers=max_workers, executor=executor,
+                          on_start=on_start)
+        try:
+            for answers in _in_order(runs):
+                if isinstance(answers, Exception):
+                    raise answers
+                statistics['Sampling runs'] += 1
+                command = command or answers.command
+                for answer, optimization in answers._raw_answers():
+                    key = frozenset(answer.split())
+                    if key in seen:
+                        statistics['Duplicated models'] += 1
+                        continue
+                    seen.add(key)
+                    samples.append((answer, optimization))
+                    if len(samples) == k:
+                        break
+                if len(samples) == k:
+                    break
+        finally:
+            runs.close()  # cancel the pending runs
+            with lock:  # stop the runs in flight, waited by the executor
+                stopped.set()
+                for answers in running:
+                    answers._interrupt()
+    return Answers(samples, command=command or '', statistics=statistics,
+                   with_optimization=True)
+
+
+def _in_order(runs:iter) -> iter:
+    """Yield results of given solve_many runs in order of submission,
+    making the samples independent of the completion order.
+
+    """
+    ready, expected = {}, 0
+    for idx, answers in runs:
+        ready[idx] = answers
+        while expected in ready:
+            yield ready.pop(expected)
+            expected += 1
@@ -0,0 +1,244 @@
+"""Sharing of the CPU cores among concurrent clingo runs.
+
+Many concurrent solve() calls each asking for many threads (-t option)
+oversubscribe the machine. A CoreScheduler knows the core budget:
+each run is granted some cores, its thread count is set accordingly,
+and it is pinned on them. Runs that do not fit in the free cores wait
+for the end of the others.
+
+    scheduler = CoreScheduler(8)
+    answers = solve('encoding.lp', options='-t 4', scheduler=scheduler)
+    print(scheduler.metrics())
+
+"""
+
+
+import os
+import time
+import shlex
+import threading
+from collections import deque
+
+
+def requested_threads(options:iter) -> (int, str or None):
+    """Return the number of threads and the parallel mode
+    asked by given clingo options.
+
+    >>> requested_threads(['-t 4', '--opt-mode=optN'])
+    (4, None)
+    >>> requested_threads('--parallel-mode=8,split')
+    (8, 'split')
+    >>> requested_threads('-t 2,compete -n 0')
+    (2, 'compete')
+    >>> requested_threads([])
+    (1, None)
+
+    """
+    threads, mode = 1, None
+    for value in _parallel_mode_values(options)[1]:
+        count, _, mode = value.partition(',')
+        threads, mode = int(count), (mode or None)
+    return threads, mode
+
+
+def with_threads(run_command:list, threads:int) -> list:
+    """Return given clingo command, asking for given number of threads
+    instead of the ones it was asking for. The parallel mode is kept.
+
+    >>> with_threads(['clingo', '-t 8,split', '-n 0', 'file.lp'], 2)
+    ['clingo', '--parallel-mode=2,split', '-n 0', 'file.lp']
+    >>> with_threads(['clingo', '-t', '4', 'file.lp'], 1)
+    ['clingo', '--parallel-mode=1', 'file.lp']
+
+    """
+    binary, *args = run_command
+    args, values = _parallel_mode_values(args)
+    mode = values[-1].partition(',')[2] if values else ''
+    return [binary, '--parallel-mode={}{}'.format(int(threads), ',' + mode if mode else ''), *args]
+
+
+def split_grant(grant:tuple, asked:iter) -> list:
+    """Return the cores of given grant given to each of the runs asking
+    for given numbers of threads, one core at a time to each run in turn.
+    With less cores than runs, some runs share a core.
+
+    >>> split_grant((0, 1, 2, 3), (2, 2, 2))
+    [(0, 1), (2,), (3,)]
+    >>> split_grant((0, 1, 2, 3), (1, 4))
+    [(0,), (1, 2, 3)]
+    >>> split_grant((0, 1), (1, 1, 1))
+    [(0,), (1,), (0,)]
+
+    """
+    asked = [max(1, int(threads)) for threads in asked]
+    counts, free = [0] * len(asked), len(grant)
+    while free and any(count < threads for count, threads in zip(counts, asked)):
+        for idx, threads in enumerate(asked):
+            if free and counts[idx] < threads:
+                counts[idx] += 1
+                free -= 1
+    shares, start = [], 0
+    for idx, count in enumerate(counts):
+        if count:
+            shares.append(tuple(grant[start:start+count]))
+            start += count
+        else:  # no core left: share one
+            shares.append((grant[idx % len(grant)],))
+    return shares
+
+
+def _parallel_mode_values(options:iter) -> (list, list):
+    """Return given options without the parallel mode ones,
+    and the values given to the parallel mode options.
+
+    """
+    options = shlex.split(options) if isinstance(options, str) else list(options)
+    kept, values = [], []
+    options = iter(options)
+    for option in options:
+        option = str(option).strip()
+        name, sep, value = option.partition('=')
+        if name == '--parallel-mode':
+            values.append(value if sep else next(options, '1'))
+        elif option == '-t':
+            values.append(next(options, '1'))
+        elif option.startswith('-t') and not option.startswith('--'):
+            values.append(option[2:].strip())
+        else:
+            kept.append(option)
+    return kept, values
+
+
+class CoreScheduler:
+    """Process-wide budget of CPU cores granted to clingo runs.
+
+    Grants are given in order of request: a run asking for more cores than
+    available waits, and so do the ones asking after it.
+
+    """
+
+    def __init__(self, cores:int or iter=None, max_threads:int=None,
+                 pin:bool=True):
+        """
+        cores -- number of cores, or iterable of core ids, to share
+                 (default to all cores available to this process)
+        max_threads -- maximal number of threads granted to a single run
+        pin -- pin the clingo processes on their cores, if possible
+
+        """
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') \
+                    else list(range(os.cpu_count() or 1))
+        if cores is None:
+            cores = available
+        elif isinstance(cores, int):
+            if cores < 1:
+                raise ValueError("At least one core is needed, not {}.".format(cores))
+            cores = available[:cores] if cores <= len(available) else range(cores)
+        self._cores = tuple(cores)
+        self._max_threads = min(int(max_threads or len(self._cores)), len(self._cores))
+        # cores beyond the available ones are virtual, and can't be pinned on
+        self._pin = (bool(pin) and hasattr(os, 'sched_setaffinity')
+                     and set(self._cores) <= set(available))
+        self._free = list(self._cores)
+        self._queue = deque()  # tickets of waiting requests
+        self._condition = threading.Condition()
+        self._created = time.monotonic()
+        self._running = 0
+        self._completed = 0
+        self._granted = 0
+        self._queue_delay = 0.
+        self._max_queue_delay = 0.
+
+    @property
+    def cores(self) -> tuple:  return self._cores
+
+
+    def acquire(self, threads:int=1, timeout:float=None) -> tuple or None:
+        """Return the ids of the cores granted to a run asking for given
+        number of threads, waiting for them to be free.
+        Return None if the timeout expired.
+
+        At least one core, and at most max_threads, are granted.
+
+        """
+        threads = max(1, min(int(threads), self._max_threads))
+        ticket = object()
+        start = time.monotonic()
+        with self._condition:
+            self._queue.append(ticket)
+            ready = lambda: self._queue[0] is ticket and len(self._free) >= threads
+            if not self._condition.wait_for(ready, timeout):
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+                return None
+            self._queue.popleft()
+            grant, self._free = tuple(self._free[:threads]), self._free[threads:]
+            delay = time.monotonic() - start
+            self._running += 1
+            self._granted += 1
+            self._queue_delay += delay
+            self._max_queue_delay = max(self._max_queue_delay, delay)
+            self._condition.notify_all()  # next in queue may fit too
+        return grant
+
+
+    def release(self, grant:tuple):
+        """Give back cores granted by acquire"""
+        with self._condition:
+            self._free.extend(grant)
+            self._running -= 1
+            self._completed += 1
+            self._condition.notify_all()
+
+
+    def release_at_exit(self, processes:iter, grant:tuple):
+        """Give back given cores when all given processes are ended"""
+        processes = tuple(processes)
+        def wait_and_release():
+            for process in processes:
+                process.wait()
+            self.release(grant)
+        threading.Thread(target=wait_and_release, daemon=True).start()
+
+
+    def preexec_fn(self, grant:tuple) -> callable or None:
+        """Return the function pinning a new process on given cores"""
+        if not self._pin:
+            return None
+        return lambda: os.sched_setaffinity(0, grant)
+
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the scheduler activity"""
+        with self._condition:
+            elapsed = time.monotonic() - self._created
+            return {
+                'cores': len(self._cores),
+                'busy cores': len(self._cores) - len(self._free),
+                'running': self._running,
+                'queued': len(self._queue),
+                'completed': self._completed,
+                'throughput': self._completed / elapsed if elapsed else 0.,
+                'mean queue delay': self._queue_delay / self._granted if self._granted else 0.,
+                'max queue delay': self._max_queue_delay,
+            }
+
+    def __repr__(self):
+        metrics = self.metrics()
+        return '<CoreScheduler cores={} busy={} running={} queued={}>'.format(
+            metrics['cores'], metrics['busy cores'], metrics['running'], metrics['queued'])
+
+
+_GLOBAL_SCHEDULER = None
+_GLOBAL_LOCK = threading.Lock()
+
+def global_scheduler() -> CoreScheduler:
+    """Return the scheduler shared by the whole process,
+    used by solve(scheduler=True).
+
+    """
+    global _GLOBAL_SCHEDULER
+    with _GLOBAL_LOCK:
+        if _GLOBAL_SCHEDULER is None:
+            _GLOBAL_SCHEDULER = CoreScheduler()
+        return _GLOBAL_SCHEDULER
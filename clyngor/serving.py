@@ -0,0 +1,287 @@
+"""Long-lived solving daemon, reached through a Unix domain socket.
+
+Scripts calling clingo many times pay the python startup, the imports
+and the solver startup at each invocation. A daemon keeps all of it warm:
+
+    python -m clyngor serve --socket /tmp/clyngor.sock --workers 4
+
+    answers = solve('encoding.lp', server='/tmp/clyngor.sock')
+
+The protocol is made of JSON lines: the client sends one request, and the
+daemon answers with one line (health, metrics) or streams the answer sets,
+ended by the statistics or an error (solve).
+
+"""
+
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import builtins
+import threading
+import socketserver
+
+import clyngor
+from clyngor.answers import Answers
+from clyngor.utils import ASPSyntaxError, ASPWarning, ResourceLimitError
+from clyngor.solving import _stderr_error
+
+
+# solve() parameters that can be given to the daemon
+SOLVE_PARAMETERS = frozenset({
+    'files', 'options', 'inline', 'nb_model', 'time_limit', 'constants',
+    'stats', 'error_on_warning', 'use_clingo_module', 'clean_path',
+    'deadline', 'threads', 'parallel_mode', 'programs',
+})
+
+
+class _SolvingMixIn:
+    """Solving of the requests received by a socketserver server.
+
+    Each connection is handled in its own thread, but at most `workers`
+    solvings run at the same time: the others are queued.
+
+    """
+    daemon_threads = True
+    parameters = SOLVE_PARAMETERS  # solve() parameters accepted in requests
+
+    def __init__(self, address:str or tuple, workers:int=4, timeout:float=None):
+        """
+        address -- address to listen on
+        workers -- maximal number of concurrent solvings
+        timeout -- default maximal number of seconds of a solving
+                   (see the deadline option of solve)
+
+        """
+        if int(workers) < 1:
+            raise ValueError("At least one worker is needed, not {}.".format(workers))
+        super().__init__(address, _RequestHandler)
+        self.workers = int(workers)
+        self.request_timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._counters = dict.fromkeys(('requests', 'queued', 'active', 'completed',
+                                        'failed', 'timeouts'), 0)
+
+
+    def _count(self, **increments):
+        with self._lock:
+            for counter, increment in increments.items():
+                self._counters[counter] += increment
+
+
+    def health(self) -> dict:
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime': time.monotonic() - self._started,
+            'clingo module': clyngor.have_clingo_module(),
+            'version': clyngor.__version__,
+        }
+
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._counters)
+        metrics['workers'] = self.workers
+        metrics['uptime'] = time.monotonic() - self._started
+        return metrics
+
+
+    def solve(self, kwargs:dict, send:callable):
+        """Solve with given solve() parameters, giving the resulting messages
+        to given callable.
+
+        """
+        unexpected = set(kwargs) - self.parameters
+        if unexpected:
+            raise ValueError("Parameters {} are not handled by the daemon."
+                             "".format(', '.join(sorted(unexpected))))
+        if kwargs.get('deadline') is None:
+            kwargs['deadline'] = self.request_timeout
+        self._solve(kwargs, send)
+
+
+    def _solve(self, kwargs:dict, send:callable):
+        """Solve with given checked solve() parameters, once a worker is free"""
+        self._count(queued=1)
+        with self._slots:
+            self._count(queued=-1, active=1)
+            answers = None
+            try:
+                answers = clyngor.solve(**kwargs)
+                for answer, optimization in answers._raw_answers():
+                    send({'answer': answer, 'optimization': optimization})
+                statistics = answers.statistics
+                self._count(completed=1, timeouts=int(bool(statistics.get('Deadline reached'))))
+                send({'end': True, 'command': answers.command, 'statistics': statistics})
+            finally:
+                if answers is not None:
+                    answers.close()
+                self._count(active=-1)
+
+
+class SolvingServer(_SolvingMixIn, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Daemon solving requests received on a Unix socket"""
+
+    def __init__(self, path:str, workers:int=4, timeout:float=None):
+        """
+        path -- path to the Unix socket to create
+        workers, timeout -- see _SolvingMixIn
+
+        """
+        if os.path.exists(path):
+            _remove_stale_socket(path)
+        super().__init__(path, workers, timeout)
+        self.path = path
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one request, made of one JSON line"""
+
+    def handle(self):
+        self.server._count(requests=1)
+        try:
+            request = json.loads(self.rfile.readline().decode())
+            kind = request.get('type', 'solve')
+            if kind == 'health':
+                self.send(self.server.health())
+            elif kind == 'metrics':
+                self.send(self.server.metrics())
+            elif kind == 'solve':
+                self.server.solve(dict(request.get('kwargs', {})), self.send)
+            else:
+                raise ValueError("Unknown request type: {}".format(repr(kind)))
+        except OSError:  # client went away
+            pass
+        except Exception as err:
+            self.server._count(failed=1)
+            try:
+                self.send({'error': _error_payload(err)})
+            except OSError:
+                pass
+
+    def send(self, message:dict):
+        self.wfile.write(json.dumps(message).encode() + b'\n')
+        self.wfile.flush()
+
+
+def _remove_stale_socket(path:str):
+    """Remove given socket file if no daemon listens on it"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+    except OSError:  # nobody there
+        os.remove(path)
+    else:
+        raise OSError("A daemon is already listening on {}".format(path))
+
+
+def _error_payload(err:Exception) -> dict:
+    """Return the JSON-serializable description of given error"""
+    payload = {'type': type(err).__name__, 'message': str(err)}
+    if isinstance(err, (ASPSyntaxError, ASPWarning)):
+        payload['payload'] = err.payload
+    elif isinstance(err, ResourceLimitError):
+        payload['payload'] = {'resource': err.resource, 'limit': err.limit, 'usage': err.usage}
+    return payload
+
+
+def _error_from_payload(payload:dict) -> Exception:
+    """Return the exception described by given error payload"""
+    kind, message = payload['type'], payload['message']
+    if kind in {'ASPSyntaxError', 'ASPWarning'}:
+        return _stderr_error(payload['payload'], error_on_warning=True)
+    if kind == 'ResourceLimitError':
+        return ResourceLimitError(message, **payload['payload'])
+    builtin = getattr(builtins, kind, None)
+    if isinstance(builtin, type) and issubclass(builtin, Exception):
+        return builtin(message)
+    return RuntimeError('{}: {}'.format(kind, message))
+
+
+def serve(path:str, workers:int=4, timeout:float=None):
+    """Run the daemon until interrupted or terminated"""
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # socket file is removed
+    with SolvingServer(path, workers, timeout) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _connect(address:str or tuple, request:dict) -> (socket.socket, object):
+    """Return the socket connected to the daemon, and the file reading its
+    response to given request.
+
+    address -- path to a Unix socket, or pair (host, port)
+
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET6 if ':' in address[0] else socket.AF_INET,
+                             socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+    except OSError:
+        sock.close()
+        raise
+    return sock, sock.makefile('rb')
+
+
+def request(address:str or tuple, kind:str) -> dict:
+    """Return the response of the daemon to a request of given type,
+    'health' or 'metrics'.
+
+    address -- path to the Unix socket of the daemon, or pair (host, port)
+               of a remote worker
+
+    """
+    sock, response = _connect(address, {'type': kind})
+    with sock, response:
+        message = json.loads(response.readline().decode())
+    if 'error' in message:
+        raise _error_from_payload(message['error'])
+    return message
+
+
+def solve_on_server(path:str, **kwargs) -> Answers:
+    """Return the Answers computed by the daemon listening at given path,
+    for given solve() parameters.
+
+    """
+    sock, response = _connect(path, {'type': 'solve', 'kwargs': kwargs})
+    statistics = {}
+    return Answers(_gen_answers(response, statistics),
+                   command='clyngor daemon at ' + path, statistics=statistics,
+                   with_optimization=True, on_close=lambda: (response.close(), sock.close()))
+
+
+def _gen_answers(response:object, statistics:dict) -> iter:
+    """Yield (answer set, optimization) read in given response of the daemon,
+    and update given statistics with the ones sent at the end.
+
+    """
+    for line in response:
+        message = json.loads(line.decode())
+        if 'answer' in message:
+            optimization = message['optimization']
+            yield message['answer'], (tuple(optimization) if optimization else None)
+        elif 'error' in message:
+            raise _error_from_payload(message['error'])
+        elif message.get('end'):
+            statistics.update(message['statistics'])
+            return
+    raise ConnectionError("The daemon closed the connection before the end of the solving.")
@@ -5,16 +5,26 @@
 
 import re
 import os
-import json
+import sys
+import time
 import shlex
-import tempfile
+import signal
+import functools
+import threading
 import subprocess
+from collections import deque
 import clyngor
 from clyngor.answers import Answers, ClingoAnswers
-from clyngor.utils import cleaned_path, ASPSyntaxError, ASPWarning
-from clyngor.parsing import parse_clasp_output, validate_clasp_stderr
+from clyngor.utils import cleaned_path, ASPSyntaxError, ASPWarning, ResourceLimitError, \
+    generate_answer_set_as_str, user_cache_dir
+from clyngor.parsing import parse_clasp_output, validate_clasp_stderr, parse_progression
 from clyngor.propagators import Main as _default_running_sequence
 
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
 
 def solve(files:iter=(), options:iter=[], inline:str=None,
           subproc_shell:bool=False, print_command:bool=False,
@@ -25,7 +35,16 @@ def solve(files:iter=(), options:iter=[], inline:str=None,
           use_clingo_module:bool=True, grounding_observers:iter=(),
           propagators:iter=(), solver_conf:object=None,
           running_sequence:callable=_default_running_sequence,
-          programs:iter=(['base', ()],)) -> iter:
+          programs:iter=(['base', ()],), pool:object=None,
+          portfolio:iter=(), cache:object=None,
+          deadline:float=None, rusage:bool=False,
+          memory_limit:int=None, cpu_limit:int=None,
+          scheduler:object=None, threads:int=None, parallel_mode:str=None,
+          progress:callable=None, coalesce:object=None,
+          checkpoint:str=None, checkpoint_every:int=100,
+          server:str=None, profile:str=None, warm_start:iter=None,
+          enumerate_parallel:int=None, partition_atoms:iter=None,
+          preflight:bool=False) -> iter:
     """Run the solver on given files, with given options, and return
     an Answers instance yielding answer sets.
 
@@ -35,11 +54,54 @@ def solve(files:iter=(), options:iter=[], inline:str=None,
     subproc_shell -- use shell=True in subprocess call (NB: you should not)
     print_command -- print full command to stdout before running it
     clean_path -- clean the path of given files before using them
-    stats -- will ask clingo for all stats, instead of just the minimal ones
+    stats -- will ask clingo for all stats, instead of just the minimal ones.
+             May be the statistics level, 2 giving the statistics of each thread.
     clingo_bin_path -- the path to the clingo binary
     error_on_warning -- raise an ASPWarning when encountering a clingo warning
     use_clingo_module -- will use the clingo module (if available)
-    force_tempfile -- use tempfile, even if only inline code is given
+    force_tempfile -- deprecated, without effect: no tempfile is ever used
+    pool -- ClingoPool instance providing already spawned clingo processes,
+            used when only inline code is given and the commands match.
+            Implies the use of the clingo binary instead of the module.
+    portfolio -- iterable of options (string or iterable) added to the given
+                 ones; one clingo per options set is run concurrently, and
+                 only the first to yield a model or to end its run is kept.
+                 The winner is given in statistics under key 'Portfolio'.
+                 Implies the use of the clingo binary instead of the module.
+    cache -- ResultCache instance where answers are searched before running
+             clingo, and stored after a complete run.
+             Implies the use of the clingo binary instead of the module.
+    deadline -- number of seconds, counted from the call, after which the
+                solver is stopped and no more answer is yielded.
+                Unlike time_limit, it may be a float, includes the time spent
+                reading the answers, and works with the clingo module.
+                If reached, statistics have the key 'Deadline reached'.
+                With the clingo module, the grounding can't be interrupted:
+                if the deadline is reached during it, no model is searched.
+    rusage -- give the resources used by clingo in statistics,
+              under key 'Resources'.
+              Implies the use of the clingo binary instead of the module.
+    memory_limit -- maximal number of bytes of memory available to clingo
+    cpu_limit -- maximal (whole) number of seconds of CPU time available to clingo
+                 If a limit is exceeded, a ResourceLimitError is raised.
+                 Limits implies the use of the clingo binary instead of the module.
+    scheduler -- CoreScheduler instance granting cores to the clingo processes,
+                 or True for the one shared by the whole process. The thread
+                 count asked in options is adapted to the granted cores, and
+                 the call waits until enough cores are free.
+                 Implies the use of the clingo binary instead of the module.
+    progress -- callable receiving the events of the solving, as soon as
+                they are read on clingo output. Events are dict with keys
+                'event' ('model' or 'progression'), 'time' (seconds since
+                the call) and the event data: 'optimization' for models,
+                'lower', 'upper' and 'error' bounds for progressions.
+                Events are also available in Answers.progression.
+                Implies the use of the clingo binary instead of the module.
+    coalesce -- Coalescer instance, or True for the one shared by the whole
+                process: concurrent calls running the same command on the
+                same input share one clingo, each one getting its own Answers.
+                Ignored if a deadline is given.
+                Implies the use of the clingo binary instead of the module.
 
     The following options needs the propagator support and/or python clingo module:
     grounding_observers -- iterable of observers to add to the grounding process
@@ -48,34 +110,110 @@ def solve(files:iter=(), options:iter=[], inline:str=None,
     running_sequence -- If given, must be a callable taking programs,
                         files and Configuration, returning both clingo.Control
                         and clingo.SolveHandle instances.
+                        It is also given the inline code, if any, as inline.
     programs -- programs to feed the running sequence with.
+    checkpoint -- file where enumerated models are saved, every checkpoint_every
+                  models. Models already saved in it are not searched again,
+                  allowing to resume a long enumeration.
+
+    server -- path to the Unix socket of a daemon (see python -m clyngor serve)
+              running the solving. Only files, options, inline, nb_model,
+              time_limit, constants, stats, error_on_warning, use_clingo_module,
+              deadline, threads, parallel_mode and programs are given to it.
+    profile -- name of a profile saved by tuning.tune, whose options are
+               used before the given ones.
+    warm_start -- a model, as yielded by a previous Answers, toward which
+                  the solver is steered with domain heuristics, e.g. the best
+                  model of a previous optimization on a close instance.
+                  Adds --heuristic=Domain to options, unless another
+                  heuristic is given (then the model has no effect).
+    enumerate_parallel -- number of clingo runs enumerating the models
+                          in parallel, each one on a disjoint part of the search
+                          space, defined by the values of a few partition atoms.
+                          Meant for the enumeration of all models of
+                          programs without optimization.
+                          Implies the use of the clingo binary for the runs.
+    partition_atoms -- atoms used for the partition (default to non-fact
+                       atoms of the grounded program, found with the clingo module)
+    preflight -- parse files and inline code with the clingo module, if available,
+                 before any run, raising ASPSyntaxError at call instead of
+                 after the grounding. Contents already validated by
+                 this process are not parsed again.
 
     Shortcut to clingo's options:
     nb_model -- number of model to output (0 for all (default), None to disable)
     time_limit -- zero or number of seconds to wait before interrupting solving
     constants -- mapping name -> value of constants for the grounding
+    threads -- number of threads used by clingo
+    parallel_mode -- 'compete' or 'split', the parallel mode of the threads
 
     """
+    start = time.monotonic()
     files = [files] if isinstance(files, str) else files
     files = tuple(map(cleaned_path, files) if clean_path else files)
+    if profile:
+        from clyngor.tuning import load_profile  # tuning needs solving
+        options = load_profile(profile) + (shlex.split(options) if isinstance(options, str)
+                                           else list(options))
+    if warm_start is not None:
+        inline = (inline or '') + '\n' + _warm_start_heuristics(warm_start)
+        options = shlex.split(options) if isinstance(options, str) else list(options)
+        if not any(str(option).startswith('--heuristic') for option in options):
+            options.append('--heuristic=Domain')
+    if preflight and clyngor.have_clingo_module():
+        _preflight(files, inline)
+    if server:  # the daemon runs the solving
+        from clyngor.serving import solve_on_server  # serving needs clyngor package
+        return solve_on_server(
+            server, files=tuple(map(os.path.abspath, files)), options=options,
+            inline=inline, nb_model=nb_model, time_limit=time_limit,
+            constants=constants, stats=stats, error_on_warning=error_on_warning,
+            use_clingo_module=use_clingo_module, clean_path=False,
+            deadline=deadline, threads=threads, parallel_mode=parallel_mode,
+            programs=programs)
+    if enumerate_parallel and int(enumerate_parallel) > 1:
+        from clyngor.partitioning import solve_partitioned  # partitioning needs solving
+        return solve_partitioned(
+            int(enumerate_parallel), partition_atoms, nb_model, inline,
+            files=files, options=options, time_limit=time_limit, constants=constants,
+            stats=stats, clingo_bin_path=clingo_bin_path, error_on_warning=error_on_warning,
+            clean_path=False, subproc_shell=subproc_shell, deadline=deadline,
+            rusage=rusage, memory_limit=memory_limit, cpu_limit=cpu_limit,
+            threads=threads, parallel_mode=parallel_mode, programs=programs)
     stdin_feed = None  # data to send to stdin
-    use_clingo_module = use_clingo_module and clyngor.have_clingo_module()
-    if use_clingo_module:
-        # the clingo API do not handle stdin feeding
-        force_tempfile = True
-    if inline and not files and not force_tempfile:  # avoid tempfile if possible
+    portfolio = tuple(portfolio or ())
+    limits = {'memory_limit': memory_limit, 'cpu_limit': cpu_limit}
+    use_clingo_module = (use_clingo_module and pool is None
+                         and not portfolio and cache is None and not rusage
+                         and not memory_limit and not cpu_limit and not scheduler
+                         and not coalesce and progress is None
+                         and clyngor.have_clingo_module())
+    if inline and not use_clingo_module:  # inline code is given through stdin
         stdin_feed, inline = inline, None
-    elif inline:
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as fd:
-            fd.write(inline)
-            tempfile_to_del = fd.name
-            files = tuple(files) + (tempfile_to_del,)
-            assert files, fd.name
+        if files:  # stdin must then be explicitely given as an input
+            files = files + ('-',)
     run_command = command(files, options, inline, nb_model, time_limit,
-                          constants, stats, clingo_bin_path=clingo_bin_path)
+                          constants, stats, clingo_bin_path=clingo_bin_path,
+                          threads=threads, parallel_mode=parallel_mode)
+
+    if portfolio:
+        base_options = shlex.split(options) if isinstance(options, str) else list(options)
+        run_commands = tuple(
+            command(files, base_options + (shlex.split(opts) if isinstance(opts, str) else list(opts)),
+                    inline, nb_model, time_limit, constants, stats,
+                    clingo_bin_path=clingo_bin_path,
+                    threads=threads, parallel_mode=parallel_mode)
+            for opts in portfolio
+        )
+    else:
+        run_commands = (run_command,)
 
     if print_command:
-        print(run_command)
+        for cmd in run_commands:
+            print(cmd)
+
+    if checkpoint and not use_clingo_module:
+        raise ValueError("Option 'checkpoint' needs the python clingo module.")
 
     if not files and not inline and not stdin_feed:
         # in this case, clingo will wait for stdin input, which will never come
@@ -85,44 +223,534 @@ def solve(files:iter=(), options:iter=[], inline:str=None,
     if use_clingo_module:
         if time_limit != 0 or constants:
             raise ValueError("Options 'time_limit' and 'constants' are not "
-                             "handled when used with python clingo module.")
+                             "handled when used with python clingo module. "
+                             "See the deadline option.")
         if solver_conf:
             raise NotImplementedError("Solver configuration handling is currently"
                                       "not implemented")
-        options = options.split() if isinstance(options, str) else options
+        options = options.split() if isinstance(options, str) else list(options)
+        if checkpoint:  # only given if needed, to support other running sequences
+            running_sequence = functools.partial(running_sequence, checkpoint=checkpoint,
+                                                 checkpoint_every=checkpoint_every)
+        if inline:  # only given if needed, to support other running sequences
+            running_sequence = functools.partial(running_sequence, inline=inline)
+        if threads or parallel_mode:
+            options.append(_parallel_option(threads, parallel_mode))
         ctl = clyngor.clingo_module.Control(options)
-        main = running_sequence(programs=programs, files=files, nb_model=nb_model,
-                                propagators=propagators, observers=grounding_observers,
-                                generator=True)
-        return main(ctl)
+        main = running_sequence(programs=programs, files=files,
+                                nb_model=nb_model, propagators=propagators,
+                                observers=grounding_observers, generator=True)
+        answers = main(ctl)  # grounds, which clingo can't interrupt
+        if deadline is not None:  # counted from the call, grounding included
+            answers._set_deadline(start + deadline, ctl.interrupt)
+        return answers
     else:
-        clingo = subprocess.Popen(
-            run_command,
-            stdin=subprocess.PIPE if stdin_feed else None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            shell=bool(subproc_shell),
-        )
-        if stdin_feed:
-            clingo.stdin.write(stdin_feed.encode())
-            clingo.stdin.close()
-        stdout = (line.decode() for line in clingo.stdout)
-        stderr = (line.decode() for line in clingo.stderr)
-        statistics = {}
+        if cache is not None:
+            cache_key = cache.key(run_commands, files, stdin_feed, error_on_warning)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                records, statistics = cached
+                return Answers(records, command='\n'.join(' '.join(cmd) for cmd in run_commands),
+                               statistics=statistics, with_optimization=True)
+        if coalesce and deadline is None:
+            from clyngor.coalescing import global_coalescer  # only loaded when used
+            coalescer = global_coalescer() if coalesce is True else coalesce
+            flight, leader = coalescer.flight((tuple(map(tuple, run_commands)), stdin_feed,
+                                               error_on_warning, rusage, memory_limit, cpu_limit))
+            if not leader:
+                return flight.follower()
+        else:
+            flight = None
+        statistics, grant = {}, None
+        try:
+            preexec_fn = _limiter(**limits)
+            preexec_fns = [preexec_fn] * len(run_commands)
+            if scheduler:
+                from clyngor.scheduling import (global_scheduler, requested_threads,
+                                                with_threads, split_grant)  # only loaded when used
+                scheduler = global_scheduler() if scheduler is True else scheduler
+                asked = tuple(requested_threads(cmd[1:])[0] for cmd in run_commands)
+                grant = scheduler.acquire(sum(asked))
+                shares = split_grant(grant, asked)  # cores of each command
+                run_commands = tuple(with_threads(cmd, len(share))
+                                     for cmd, share in zip(run_commands, shares))
+                run_command = run_commands[0]
+                preexec_fns = [_chained(preexec_fn, scheduler.preexec_fn(share))
+                               for share in shares]
+                preexec_fn = preexec_fns[0]
+            if portfolio:
+                processes = [_popen(cmd, stdin_feed, subproc_shell, cmd_preexec_fn)
+                             for cmd, cmd_preexec_fn in zip(run_commands, preexec_fns)]
+                race = _PortfolioRace(processes, portfolio, statistics,
+                                      error_on_warning, limits)
+                stdout, stderr = race.stdout(), race.stderr
+                full_command = '\n'.join(' '.join(cmd) for cmd in run_commands)
+            else:
+                clingo = None
+                if pool is not None and stdin_feed and not subproc_shell and not preexec_fn:
+                    clingo = pool.acquire(run_command)
+                    if clingo is not None:
+                        clingo.started = time.monotonic()  # not the spawn time
+                        _feed_stdin(clingo, stdin_feed)
+                if clingo is None:
+                    clingo = _popen(run_command, stdin_feed, subproc_shell, preexec_fn)
+                stdout = clingo.output_lines()
+                stderr = _StderrReader(clingo, error_on_warning, limits=limits)
+                full_command = ' '.join(run_command)
+                processes = [clingo]
+        except BaseException as err:
+            if grant is not None:
+                scheduler.release(grant)
+            if flight is not None:  # followers will raise it too
+                flight.abort(err)
+            raise
+        if grant is not None:
+            scheduler.release_at_exit(processes, grant)
+
+        progression, completed = [], []
+        answers = _gen_answers(stdout, stderr, statistics, rusage,
+                               on_event=_event_recorder(progression, progress, start),
+                               on_end=completed.append)
+        if cache is not None and deadline is None:  # partial runs are not cached
+            answers = cache.recorded(cache_key, answers, statistics,
+                                     complete=lambda: completed == [True])
+        answers = Answers(answers, command=full_command, statistics=statistics,
+                          with_optimization=True, progression=progression,
+                          on_close=functools.partial(_terminate, processes))
+        if deadline is not None:
+            answers._set_deadline(start + deadline,
+                                  functools.partial(_terminate, processes))
+        return answers if flight is None else flight.take_off(answers)
+
+
+def _popen(run_command:list, stdin_feed:str=None, subproc_shell:bool=False,
+           preexec_fn:callable=None) -> '_ClingoProcess':
+    """Return the clingo process running given command, fed with given data"""
+    clingo = _ClingoProcess(
+        run_command,
+        stdin=subprocess.PIPE if stdin_feed else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=bool(subproc_shell),
+        preexec_fn=preexec_fn,
+    )
+    _feed_stdin(clingo, stdin_feed)
+    return clingo
+
+
+def _feed_stdin(clingo:subprocess.Popen, stdin_feed:str or None):
+    """Send given data to stdin of given process, then close it"""
+    if stdin_feed:
+        clingo.stdin.write(stdin_feed.encode())
+        clingo.stdin.close()
+
+
+def _terminate(processes:iter):
+    """Kill given processes if still running"""
+    for clingo in processes:
+        if clingo.poll() is None:
+            clingo.kill()
+            clingo.wait()
+
+
+def _kill(clingo:subprocess.Popen, stderr:'_StderrReader'=None):
+    """Kill given process, release its pipes and wait for its end.
+
+    stderr -- the reader of its error output, if any, waited
+              before the pipe it reads is closed
+
+    """
+    clingo.kill()
+    for pipe in (clingo.stdin, clingo.stdout):
+        if pipe is not None:
+            pipe.close()
+    clingo.wait()
+    if stderr is not None:  # reaches the end of output, since clingo ended
+        stderr.join()
+    if clingo.stderr is not None:
+        clingo.stderr.close()
+
+
+def _limiter(memory_limit:int=None, cpu_limit:int=None) -> callable or None:
+    """Return the function setting given limits in the clingo process,
+    or None if there is no limit.
+
+    """
+    if not memory_limit and not cpu_limit:
+        return None
+    if resource is None:
+        raise NotImplementedError("Resource limits are not available on this platform.")
+    if cpu_limit and cpu_limit != int(cpu_limit):
+        raise ValueError("CPU time limit must be a whole number of seconds, not {}."
+                         "".format(cpu_limit))
+    def set_limits():
+        if memory_limit:
+            resource.setrlimit(resource.RLIMIT_AS, (int(memory_limit),) * 2)
+        if cpu_limit:  # clingo is interrupted at soft limit, killed at hard one
+            resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_limit), int(cpu_limit) + 1))
+    return set_limits
+
+
+def _event_recorder(events:list, callback:callable, start:float) -> callable:
+    """Return the function timing an event, appending it to given list,
+    and giving it to given callback if any.
+
+    """
+    def record(event:dict):
+        event['time'] = time.monotonic() - start
+        events.append(event)
+        if callback is not None:
+            callback(event)
+    return record
+
+
+def _chained(*functions:callable) -> callable or None:
+    """Return the function calling all given functions that are not None,
+    or None if there is no such function.
+
+    """
+    functions = tuple(func for func in functions if func is not None)
+    if not functions:
+        return None
+    def chained():
+        for func in functions:
+            func()
+    return chained
+
+
+def _limit_breach(clingo:'_ClingoProcess', lines:iter, memory_limit:int=None,
+                  cpu_limit:int=None) -> ResourceLimitError or None:
+    """Return the error to raise if given ended clingo process
+    exceeded one of given limits.
+
+    lines -- last lines of clingo error output
+
+    """
+    usage = clingo.resources()
+    if memory_limit and any('bad_alloc' in line or line.startswith('MemoryError')
+                            for line in lines):
+        return ResourceLimitError(
+            "Clingo exceeded the memory limit of {} bytes".format(memory_limit),
+            'memory', memory_limit, usage)
+    if cpu_limit and _cpu_limit_reached(clingo, lines, usage, cpu_limit):
+        return ResourceLimitError(
+            "Clingo exceeded the CPU time limit of {}s".format(cpu_limit),
+            'cpu', cpu_limit, usage)
+    return None
+
+
+def _cpu_limit_reached(clingo:'_ClingoProcess', lines:iter, usage:dict,
+                       cpu_limit:int) -> bool:
+    """True if given ended clingo process was stopped by the CPU time limit:
+    interrupted by SIGXCPU at the soft limit, or killed at the hard one.
+
+    The CPU time given by rusage is not compared to the soft limit, as it may be
+    slightly below the time counted by the kernel when it signaled clingo.
+
+    """
+    if clingo.returncode == -signal.SIGXCPU:  # not handled by clingo
+        return True
+    if clingo.returncode == -signal.SIGKILL:  # hard limit, or killed by us
+        return bool(usage) and usage['User time'] + usage['System time'] >= cpu_limit
+    if not any('by signal' in line for line in lines):
+        return False
+    # SIGINT is never sent, so clingo was interrupted by SIGXCPU or its time limit
+    time_limit = _time_limit_option(clingo.args)
+    return not time_limit or not usage or usage['Wall time'] < time_limit
+
+
+def _time_limit_option(args:list or str) -> int:
+    """Return the time limit given in clingo command, or 0 if none"""
+    args = shlex.split(args) if isinstance(args, str) else list(args)
+    for idx, arg in enumerate(args):
+        if arg.startswith('--time-limit='):
+            return int(arg[len('--time-limit='):])
+        if arg == '--time-limit' and idx + 1 < len(args):
+            return int(args[idx + 1])
+    return 0
+
+
+class _ClingoProcess(subprocess.Popen):
+    """Popen keeping track of the resources used by the process,
+    and of the number of bytes read on its standard output.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.started, self.ended = time.monotonic(), None
+        self.rusage, self.bytes_read = None, 0
+        self._reaping = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def poll(self) -> int or None:
+        if self.returncode is None:
+            self._wait4(blocking=False)
+        return super().poll()
+
+    def wait(self, timeout:float=None) -> int:
+        if timeout is None:
+            self._wait4(blocking=True)
+        else:
+            end = time.monotonic() + timeout
+            while self.poll() is None:
+                if time.monotonic() >= end:
+                    raise subprocess.TimeoutExpired(self.args, timeout)
+                time.sleep(0.005)
+        return super().wait(timeout)
+
+    def _wait4(self, blocking:bool):
+        """Reap the process with wait4, keeping its resources usage.
+        Does nothing if another thread is reaping it without blocking.
+
+        """
+        if not hasattr(os, 'wait4'):  # Popen will reap it
+            return
+        if not self._reaping.acquire(blocking):
+            return
+        try:
+            if self.returncode is not None:  # already reaped
+                return
+            try:
+                pid, status, rusage = os.wait4(self.pid, 0 if blocking else os.WNOHANG)
+            except ChildProcessError:  # reaped elsewhere: Popen handles that case
+                return
+            if pid == self.pid:
+                self.rusage, self.ended = rusage, time.monotonic()
+                self.returncode = (-os.WTERMSIG(status) if os.WIFSIGNALED(status)
+                                   else os.WEXITSTATUS(status))
+        finally:
+            self._reaping.release()
+
+    def output_lines(self) -> iter:
+        """Yield decoded lines of standard output"""
+        for line in self.stdout:
+            self.bytes_read += len(line)
+            yield line.decode()
+
+    def resources(self) -> dict:
+        """Return the resources used by the process, waiting for its end.
+        Empty if the process was reaped without its rusage.
+
+        """
+        self.wait()
+        if self.rusage is None:
+            return {}
+        return {
+            'User time': self.rusage.ru_utime,
+            'System time': self.rusage.ru_stime,
+            # bytes on macOS, kilobytes elsewhere
+            'Max RSS': self.rusage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024),
+            'Wall time': self.ended - self.started,
+            'Bytes read': self.bytes_read,
+        }
+
+
+class _PortfolioRace:
+    """Concurrent run of many clingo processes, keeping the output
+    of the first one yielding a model without optimization, or ending its run
+    cleanly (hence proving the optimum or unsatisfiability, or enumerating
+    all models).
+
+    Others processes are killed as soon as the winner is known.
+    Processes failing, or ending without proven result, are dropped from the race.
+    If all are dropped, the first one that did not fail is kept,
+    and if they all failed, the error of the first one is raised.
+
+    """
+
+    def __init__(self, processes:list, portfolio:iter, statistics:dict,
+                 error_on_warning:bool=False, limits:dict={}):
+        self._processes = tuple(processes)
+        self._stderrs = tuple(_StderrReader(process, error_on_warning, limits=limits)
+                              for process in self._processes)
+        self._portfolio = tuple(portfolio)
+        self._statistics = statistics
+        self._lines = tuple([] for _ in self._processes)
+        self._dropped = {}  # index of process ended without winning -> its failure
+        self._lock = threading.Lock()
+        self._decided = threading.Event()
+        self.winner, self.error = None, None
+        for idx in range(len(self._processes)):
+            threading.Thread(target=self._read, args=(idx,), daemon=True).start()
+
+    def _read(self, idx:int):
+        """Read output of process of given index until it wins or loses"""
+        process, lines = self._processes[idx], self._lines[idx]
+        state = None  # 'model' when reading a model, 'after' just after
+        won = False
+        for line in process.output_lines():
+            lines.append(line)
+            if state == 'after' and not line.startswith('Optimization: '):
+                won = True  # model without optimization
+                break
+            if line.startswith('Answer: '):
+                state = 'model'
+            elif state == 'model':
+                state = 'after'
+            else:
+                state = None
+            if self._decided.is_set():
+                break
+        if not won and not self._decided.is_set():
+            failure = self._failure(idx)
+            won = failure is None and (
+                process.returncode in CLEAN_EXIT_CODES
+                or any(line.strip() in PROOF_LINES for line in lines))
+            if not won:  # released once the race is decided
+                self._drop(idx, failure)
+                return
+        if not won or not self._declare(idx):  # lost the race
+            _kill(process, self._stderrs[idx])
+
+    def _failure(self, idx:int) -> Exception or None:
+        """Return the error of the ended process of given index, if it failed"""
+        process, stderr = self._processes[idx], self._stderrs[idx]
+        process.wait()
+        stderr.join()
+        if stderr.error is not None:
+            return stderr.error
+        if (0 <= process.returncode < 33  # not an error, nor killed
+                and any(line.strip() in RESULT_LINES for line in self._lines[idx])):
+            return None
+        errors = ' '.join(line.strip() for line in stderr.lines
+                          if line.startswith('*** ERROR'))
+        return RuntimeError("Clingo failed with options {}: {}".format(
+            self._options(idx), errors or 'exit code {}'.format(process.returncode)))
 
-        # remove the tempfile after the work.
-        on_end = None
-        if inline and tempfile_to_del:
-            on_end = lambda: os.remove(tempfile_to_del)
+    def _drop(self, idx:int, failure:Exception or None):
+        """Remove given process from the race, ending it if all are dropped"""
+        with self._lock:
+            self._dropped[idx] = failure
+            if self.winner is None:
+                if len(self._dropped) < len(self._processes):
+                    return
+                not_failed = [other for other, error in self._dropped.items() if error is None]
+                self.winner = (not_failed or list(self._dropped))[0]
+                self.error = self._dropped[self.winner]
+                self._record_winner()
+            self._release_dropped()
+        self._decided.set()
 
-        return Answers(_gen_answers(stdout, stderr, statistics, error_on_warning),
-                       command=' '.join(run_command), on_end=on_end,
-                       statistics=statistics, with_optimization=True)
+    def _release_dropped(self):
+        """Release the dropped processes, except the winner"""
+        for idx in self._dropped:
+            if idx != self.winner:
+                _kill(self._processes[idx], self._stderrs[idx])
+
+    def _declare(self, idx:int) -> bool:
+        """Declare given process as the winner ; False if there is already one"""
+        with self._lock:
+            if self.winner is not None:
+                return False
+            self.winner = idx
+            self._record_winner()
+            self._release_dropped()
+        for other, process in enumerate(self._processes):
+            if other != idx:
+                process.kill()
+        self._decided.set()
+        return True
+
+    def _options(self, idx:int) -> str:
+        options = self._portfolio[idx]
+        return options if isinstance(options, str) else ' '.join(options)
+
+    def _record_winner(self):
+        self._statistics['Portfolio'] = {'winner': self.winner,
+                                         'options': self._options(self.winner)}
+
+    def stdout(self) -> iter:
+        """Yield lines of the winner output"""
+        self._decided.wait()
+        if self.error is not None:  # all processes failed
+            raise self.error
+        yield from self._lines[self.winner]
+        yield from self._processes[self.winner].output_lines()
+
+    @property
+    def stderr(self) -> '_StderrReader':
+        """Reader of the winner error output"""
+        self._decided.wait()
+        return self._stderrs[self.winner]
+
+
+# exit codes of clingo: satisfiable, unsatisfiable, search space exhausted
+CLEAN_EXIT_CODES = {10, 20, 30}
+# results that are proven, whatever the exit code
+PROOF_LINES = {'OPTIMUM FOUND', 'UNSATISFIABLE'}
+# results printed at the end of a run that did not fail
+RESULT_LINES = PROOF_LINES | {'SATISFIABLE', 'UNKNOWN'}
+
+
+def _run_completed(clingo:subprocess.Popen, result:str or None, statistics:dict) -> bool:
+    """True if given ended clingo process printed given result
+    without being interrupted, by its time limit or by a signal.
+
+    """
+    if result not in RESULT_LINES - {'UNKNOWN'}:
+        return False
+    if 'TIME LIMIT' in statistics or 'INTERRUPTED' in statistics:
+        return False
+    clingo.wait()
+    return 0 <= clingo.returncode < 33 and not clingo.returncode & 1  # interrupt bit
+
+
+class _StderrReader(threading.Thread):
+    """Read the error output of clingo concurrently to the standard output,
+    so clingo is never blocked by a full pipe.
+
+    The first defect to report aborts the run by killing clingo,
+    and is raised by the check method, unless clingo exceeded one of given
+    resource limits, in which case the ResourceLimitError is raised.
+    Only the last lines read are kept.
+
+    """
+
+    def __init__(self, clingo:'_ClingoProcess', error_on_warning:bool=False,
+                 max_lines:int=100, limits:dict={}):
+        super().__init__(daemon=True)
+        self.clingo = clingo
+        self._error_on_warning = bool(error_on_warning)
+        self._limits = {name: limit for name, limit in limits.items() if limit}
+        self.lines = deque(maxlen=max_lines)
+        self.error = None
+        self.start()
+
+    def run(self):
+        for payload in validate_clasp_stderr(self._read_lines()):
+            self.error = _stderr_error(payload, self._error_on_warning)
+            if self.error is not None:
+                self.clingo.kill()
+                break
+        for _ in self._read_lines():  # just drain
+            pass
+
+    def _read_lines(self) -> iter:
+        for line in self.clingo.stderr:
+            line = line.decode()
+            self.lines.append(line)
+            yield line
+
+    def check(self, wait:bool=False):
+        """Raise the error found in clingo output, if any.
+        If wait, wait for the end of the output before.
+
+        """
+        if wait:
+            self.join()
+        if self._limits and (wait or self.error is not None):
+            self.join()
+            breach = _limit_breach(self.clingo, self.lines, **self._limits)
+            if breach is not None:
+                raise breach
+        if self.error is not None:
+            raise self.error
 
 
 def command(files:iter=(), options:iter=[], inline:str=None,
             nb_model:int=0, time_limit:int=0, constants:dict={},
-            stats:bool=True, clingo_bin_path:str=None) -> iter:
+            stats:bool=True, clingo_bin_path:str=None,
+            threads:int=None, parallel_mode:str=None) -> iter:
     """Return the shell command running the solver on given files,
     with given options.
 
@@ -134,7 +762,9 @@ def command(files:iter=(), options:iter=[], inline:str=None,
     nb_model -- number of model to output (0 for all (default), None to disable)
     time_limit -- zero or number of seconds to wait before interrupting solving
     constants -- mapping name -> value of constants for the grounding
-    stats -- True to provides the --stats flag
+    stats -- True to provides the --stats flag, or the statistics level
+    threads -- number of threads used by clingo
+    parallel_mode -- 'compete' or 'split', the parallel mode of the threads
 
     """
     files = [files] if isinstance(files, str) else list(files)
@@ -158,16 +788,154 @@ def command(files:iter=(), options:iter=[], inline:str=None,
         options.append('-n ' + str(nb_model))
     elif nb_model is not None:
         options.append('-n 0')
-    if stats:
+    if threads or parallel_mode:
+        options.append(_parallel_option(threads, parallel_mode))
+    if stats is True:
         options.append('--stats')
+    elif stats:
+        options.append('--stats={}'.format(int(stats)))
 
     return [clingo_bin_path or clyngor.CLINGO_BIN_PATH, *options, *files]
 
 
-def clingo_version(clingo_bin_path:str=None) -> dict:
-    """Return clingo's version information in a dict"""
+def _parallel_option(threads:int=None, parallel_mode:str=None) -> str:
+    """Return the clingo option asking for given threads and parallel mode"""
+    if parallel_mode not in {None, 'compete', 'split'}:
+        raise ValueError("Parallel mode must be 'compete' or 'split', not {}."
+                         "".format(repr(parallel_mode)))
+    try:
+        threads = 1 if threads is None else int(threads)
+    except ValueError:
+        raise ValueError("Number of threads must be int, not " + type(threads).__name__)
+    if threads < 1:
+        raise ValueError("Number of threads must be >= 1.")
+    return '--parallel-mode={}{}'.format(threads, ',' + parallel_mode if parallel_mode else '')
+
+
+_PREFLIGHT_VERDICTS = {}  # content hash -> error payload, or None if valid
+_PREFLIGHT_LOCK = threading.Lock()
+
+def _preflight(files:iter, inline:str or None):
+    """Raise the ASPSyntaxError of the first invalid given file or inline code,
+    as it would be raised after the clingo run.
+
+    """
+    import hashlib  # slow to import, and only needed by preflight
+    sources = [(file, None) for file in files if file != '-']
+    if inline:  # named like in the clingo run, reading it on stdin
+        sources.append(('-', inline))
+    for name, content in sources:
+        if content is None:
+            with open(name, 'rb') as fd:
+                data = fd.read()
+        else:
+            data = content.encode()
+        key = hashlib.sha256(name.encode() + b'\0' + data).hexdigest()
+        with _PREFLIGHT_LOCK:
+            known = key in _PREFLIGHT_VERDICTS
+            payload = _PREFLIGHT_VERDICTS.get(key)
+        if not known:
+            payload = _parsing_error(name, content)
+            with _PREFLIGHT_LOCK:
+                _PREFLIGHT_VERDICTS[key] = payload
+        if payload is not None:
+            raise _stderr_error(payload, error_on_warning=False)
+
+
+def _parsing_error(name:str, content:str or None) -> dict or None:
+    """Return the payload of the first error found by the clingo module
+    parsing given file, or given content named name if not None.
+
+    """
+    from clingo import ast  # only called when the clingo module is available
+    messages = []
+    logger = lambda code, message: messages.append(message)
+    try:
+        if content is None:
+            ast.parse_files([name], lambda _: None, logger=logger)
+        else:
+            ast.parse_string(content, lambda _: None, logger=logger)
+    except RuntimeError:
+        messages = ''.join(messages)
+        if content is not None:  # parsed content is named <string>
+            messages = re.sub(r'^<string>:', lambda _: name + ':', messages, flags=re.MULTILINE)
+        for payload in validate_clasp_stderr(iter(messages.splitlines())):
+            if payload['level'] == 'error':
+                return payload
+    return None
+
+
+def _warm_start_heuristics(model:iter) -> str:
+    """Return the domain heuristics making the solver try first
+    to assign true the atoms of given model.
+
+    model -- iterable of atoms, as tuple (predicate, args) or string,
+             or dict {predicate: [args]}
+
+    >>> print(_warm_start_heuristics({('b', ()), ('a', (1, '"x"'))}))
+    #heuristic a(1,"x"). [1,true]
+    #heuristic b. [1,true]
+    >>> print(_warm_start_heuristics(['p(1)']))
+    #heuristic p(1). [1,true]
+
+    Other atoms are left to the default sign of the solver, which is false.
+
+    """
+    if isinstance(model, dict):
+        atoms = generate_answer_set_as_str(model)
+    else:
+        atoms = (next(generate_answer_set_as_str((atom,))) if isinstance(atom, tuple)
+                 else str(atom) for atom in model)
+    return '\n'.join('#heuristic {}. [1,true]'.format(atom) for atom in sorted(atoms))
+
+
+def clingo_version(clingo_bin_path:str=None, cached:bool=True) -> dict:
+    """Return clingo's version information in a dict.
+
+    clingo_bin_path -- the path to the clingo binary
+    cached -- use the probe results cached for the binary, if any
+
+    Probe results are cached in this process and in the user cache directory,
+    keyed by the resolved path of the binary, its modification time and size.
+    See clear_probe_cache.
+
+    """
+    binary = clingo_bin_path or clyngor.CLINGO_BIN_PATH
+    key = _probe_key(binary)
+    if key is None or not cached:  # binary not found, or must be probed
+        return _probe_version(binary)
+    with _PROBES_LOCK:
+        values = _PROBES.get(key)
+        if values is None:
+            values = _load_probes().get(key)
+        if values is None:
+            values = _probe_version(binary)
+            _save_probe(key, values)
+        _PROBES[key] = values
+    return dict(values)
+
+
+_PROBES = {}  # probe key -> clingo_version values
+_PROBES_LOCK = threading.Lock()
+
+def _probe_key(binary:str) -> str or None:
+    """Return the key identifying given binary in its current state,
+    or None if it can't be found.
+
+    """
+    import shutil  # imports many compression modules
+    path = shutil.which(binary)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    return '{}|{}|{}'.format(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _probe_version(binary:str) -> dict:
+    """Return clingo's version information, asked to given binary"""
     clingo = subprocess.Popen(
-        [clingo_bin_path or clyngor.CLINGO_BIN_PATH, '--version', '--outf=2'],
+        [binary, '--version', '--outf=2'],
         stderr = subprocess.PIPE,
         stdout = subprocess.PIPE,
     )
@@ -188,46 +956,122 @@ def clingo_version(clingo_bin_path:str=None) -> dict:
     return values
 
 
+def _probes_file() -> str:
+    return os.path.join(user_cache_dir(), 'probes.json')
 
-def _gen_answers(stdout:iter, stderr:iter, statistics:dict,
-                 error_on_warning:bool) -> (str, int or None):
+
+def _load_probes() -> dict:
+    """Return the probe results saved on disk, if readable"""
+    import json
+    try:
+        with open(_probes_file()) as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_probe(key:str, values:dict):
+    """Save given probe results on disk, forgetting the ones of previous
+    states of the same binary. Saving is skipped if not possible.
+
+    """
+    import json
+    path = key.split('|')[0]
+    probes = {other: other_values for other, other_values in _load_probes().items()
+              if other.split('|')[0] != path}
+    probes[key] = values
+    try:
+        tmp = _probes_file() + '.{}.tmp'.format(os.getpid())
+        with open(tmp, 'w') as fd:
+            json.dump(probes, fd)
+        os.replace(tmp, _probes_file())  # never leave a partially written file
+    except OSError:
+        pass
+
+
+def clear_probe_cache():
+    """Forget the probe results of all binaries, in this process and on disk"""
+    with _PROBES_LOCK:
+        _PROBES.clear()
+        try:
+            os.remove(_probes_file())
+        except FileNotFoundError:
+            pass
+
+
+def _gen_answers(stdout:iter, stderr:_StderrReader, statistics:dict,
+                 rusage:bool=False, on_event:callable=None,
+                 on_end:callable=None) -> (str, int or None):
     """Yield 2-uplet (answer set, optimization),
-    and update given statistics dict with statistics payloads
+    and update given statistics dict with statistics payloads,
+    and with the resources used by clingo if rusage is set.
+
+    on_event -- if given, called with model and progression events
+                as soon as they are read.
+    on_end -- if given, called once the output is read, with True if
+              clingo completed its run, False if it was interrupted.
+
+    Errors found by given error output reader are raised as soon as possible.
 
     """
+    on_event = on_event or (lambda event: None)
     answer = None  # is used to generate a model only when we are sur there is (no) optimization
-    for ptype, payload in parse_clasp_output(stdout, yield_stats=True):
+    result = None  # result line of clingo, like SATISFIABLE
+    for ptype, payload in parse_clasp_output(stdout, yield_stats=True, yield_prgs=True,
+                                             yield_info=on_end is not None):
+        stderr.check()
         if ptype == 'answer':
             if answer is not None:
+                on_event({'event': 'model', 'optimization': None})
                 yield answer, None  # no optimization to yield
             answer = payload
         elif ptype == 'optimization':
             if answer is not None:
+                on_event({'event': 'model', 'optimization': payload})
                 yield answer, payload
                 answer = None
             else:
                 assert False, "Optimization line without answer: " + repr(payload)
+        elif ptype == 'progression':
+            on_event(dict(parse_progression(payload), event='progression'))
         elif ptype == 'statistics':
             statistics.update(payload)
         elif ptype == 'info':
-            pass  # don't care
+            result = next((line.strip() for line in payload
+                           if line.strip() in RESULT_LINES), result)
         else:
             assert ptype in parse_clasp_output.out_types, 'solving.parse_clasp_output yields an unexpceted type ' + repr(ptype)
     if answer is not None:  # if no optimization, probably one miss
+        on_event({'event': 'model', 'optimization': None})
         yield answer, None
+    if rusage:
+        stderr.join()
+        statistics['Resources'] = stderr.clingo.resources()
+    stderr.check(wait=True)
+    if on_end is not None:
+        on_end(_run_completed(stderr.clingo, result, statistics))
+
 
-    # handle stderr
+def _handle_stderr(stderr:iter, error_on_warning:bool):
+    """Raise the errors found in given clingo error output"""
     for payload in validate_clasp_stderr(stderr):
-        if payload['level'] == 'error' and payload['message'].startswith('syntax error, '):
-            raise ASPSyntaxError(
-                payload['human message'][len('syntax error, '):],
-                (payload['filename'], payload['lineno'],
-                 payload['char_beg'], payload['text']),
-                payload=payload)
-        elif payload['level'] in {'warning', 'info'}:
-            if error_on_warning:
-                raise ASPWarning(payload['human message'], payload)
-            else:
-                pass  # do nothing, user said
+        error = _stderr_error(payload, error_on_warning)
+        if error is not None:
+            raise error
+
+
+def _stderr_error(payload:dict, error_on_warning:bool) -> Exception or None:
+    """Return the exception to raise for given clingo error output payload"""
+    if payload['level'] == 'error' and payload['message'].startswith('syntax error, '):
+        return ASPSyntaxError(
+            payload['human message'][len('syntax error, '):],
+            (payload['filename'], payload['lineno'],
+             payload['char_beg'], payload['text']),
+            payload=payload)
+    elif payload['level'] in {'warning', 'info'}:
+        if error_on_warning:
+            return ASPWarning(payload['human message'], payload)
         else:
-            raise SystemError("Clingo yield a non-handled error " + repr(payload))
+            return None  # do nothing, user said
+    else:
+        return SystemError("Clingo yield a non-handled error " + repr(payload))
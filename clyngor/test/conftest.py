@@ -3,6 +3,7 @@
 """
 
 import pytest
+from clyngor import solving
 
 
 def pytest_addoption(parser):
@@ -17,3 +18,14 @@ def pytest_collection_modifyitems(config, items):
     for item in items:
         if 'slow' in item.keywords:
             item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    """List of the clingo processes spawned by solve"""
+    processes = []
+    def popen(*args, _popen=solving._popen):
+        processes.append(_popen(*args))
+        return processes[-1]
+    monkeypatch.setattr(solving, '_popen', popen)
+    return processes
@@ -1,5 +1,9 @@
 
+import os
+import sys
+import json
 import tempfile
+import subprocess
 import pytest
 import clyngor
 from clyngor import ASP, solve, command
@@ -143,34 +147,34 @@ def test_no_input(capsys):
 def test_syntax_error():
     assert not clyngor.have_clingo_module()
     with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
-        tuple(clyngor.solve((), inline='invalid', force_tempfile=True))
-    assert excinfo.value.filename.startswith('/tmp/tmp')
+        tuple(clyngor.solve((), inline='invalid'))
+    assert excinfo.value.filename == '-'
     assert excinfo.value.lineno == 2
     assert excinfo.value.offset == 1
     assert excinfo.value.payload['char_end'] == 2
-    assert excinfo.value.msg.startswith('unexpected EOF in file /tmp/tmp')
+    assert excinfo.value.msg.startswith('unexpected EOF in file -')
     assert excinfo.value.msg.endswith(' at line 2 and column 1-2')
 
 
 @clingo_noncompliant
 def test_syntax_error_semicolon():
     with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
-        tuple(clyngor.solve((), inline='color(X,red):- ;int(X,"adult").', force_tempfile=True))
-    assert excinfo.value.filename.startswith('/tmp/tmp')
+        tuple(clyngor.solve((), inline='color(X,red):- ;int(X,"adult").'))
+    assert excinfo.value.filename == '-'
     assert excinfo.value.lineno == 1
     assert excinfo.value.offset == 16
-    assert excinfo.value.msg.startswith('unexpected ; in file /tmp/tmp')
+    assert excinfo.value.msg.startswith('unexpected ; in file -')
     assert excinfo.value.msg.endswith(' at line 1 and column 16-17')
 
 
 @clingo_noncompliant
 def test_syntax_error_brace():
     with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
-        tuple(clyngor.solve((), inline='color(X,red):- {{}}.', force_tempfile=True))
-    assert excinfo.value.filename.startswith('/tmp/tmp')
+        tuple(clyngor.solve((), inline='color(X,red):- {{}}.'))
+    assert excinfo.value.filename == '-'
     assert excinfo.value.lineno == 1
     assert excinfo.value.offset == 17
-    assert excinfo.value.msg.startswith('unexpected { in file /tmp/tmp')
+    assert excinfo.value.msg.startswith('unexpected { in file -')
     assert excinfo.value.msg.endswith(' at line 1 and column 17-18')
 
 
@@ -189,13 +193,80 @@ def test_syntax_error_brace_with_stdin():
 def test_undefined_warning():
     assert not clyngor.have_clingo_module()
     with pytest.raises(clyngor.ASPWarning) as excinfo:
-        tuple(clyngor.solve((), inline='b:- c.', error_on_warning=True, force_tempfile=True))
+        tuple(clyngor.solve((), inline='b:- c.', error_on_warning=True))
     assert excinfo.value.atom == 'c'
     assert len(excinfo.value.args) == 1
-    start = "atom 'c' does not occur in any rule head in file /tmp/tmp"
+    start = "atom 'c' does not occur in any rule head in file -"
     assert excinfo.value.args[0].startswith(start)
     assert excinfo.value.args[0].endswith(" at line 1 and column 5-6")
 
     # NB: the following should NOT raise any error (default value)
     tuple(clyngor.solve((), inline='b:- c.', error_on_warning=False))
     tuple(clyngor.solve((), inline='b:- c.'))
+
+
+@clingo_noncompliant
+def test_syntax_error_inline_with_files():
+    with tempfile.NamedTemporaryFile('wt', delete=False) as fd:
+        fd.write('a.')
+    with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
+        tuple(clyngor.solve(fd.name, inline='b:- a.\nc(.'))
+    assert excinfo.value.filename == '-'
+    assert excinfo.value.lineno == 2
+
+
+@clingo_noncompliant
+def test_inline_with_files():
+    with tempfile.NamedTemporaryFile('wt', delete=False) as fd:
+        fd.write('a.')
+    answers = clyngor.solve(fd.name, inline='b:- a.').no_arg
+    assert answers.command.endswith(fd.name + ' -')
+    assert tuple(answers) == (frozenset('ab'),)
+
+
+def _run_python(code:str, *options:str) -> str:
+    """Return the output of given code, run by a new interpreter
+    with given command line options"""
+    path = [os.path.dirname(os.path.dirname(clyngor.__file__)), os.environ.get('PYTHONPATH')]
+    output = subprocess.run([sys.executable, *options, '-c', code], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, check=True,
+                            env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, path))))
+    return output.stdout.decode() + output.stderr.decode()
+
+
+def test_import_is_lazy():
+    """Importing clyngor and solving with the binary must not import
+    the optional or slow dependencies"""
+    code = ('import sys, clyngor\n'
+            'models = tuple(clyngor.ASP("a. b:- a.", use_clingo_module=False))\n'
+            'print("\\n".join(sorted(sys.modules)))')
+    modules = set(_run_python(code).split())
+    assert 'clyngor.solving' in modules
+    slow = {'clingo', 'arpeggio', 'pypeg2', 'asyncio', 'concurrent.futures', 'sqlite3',
+            'multiprocessing', 'socketserver', 'tempfile', 'json', 'hashlib', 'shutil',
+            'clyngor.scheduling', 'clyngor.coalescing'}
+    assert modules & slow == set()
+
+
+# import time of clyngor, measured at about 80ms before the imports were made lazy,
+# and 70ms after (98ms and 66ms when the clingo module is installed)
+IMPORT_TIME_BUDGET = 0.1
+
+
+def test_import_time():
+    """Importing clyngor stays below the budget, in the median of a few runs"""
+    times = []
+    for _ in range(5):
+        output = _run_python('import clyngor', '-X', 'importtime')  # printed on stderr
+        line = next(line for line in output.splitlines() if line.endswith('| clyngor'))
+        times.append(int(line.split('|')[1]) / 1e6)  # cumulative, in microseconds
+    assert sorted(times)[2] < IMPORT_TIME_BUDGET
+
+
+def test_lazy_attributes():
+    for name, module in clyngor._LAZY_ATTRIBUTES.items():
+        assert name in dir(clyngor)
+        assert getattr(clyngor, name) is getattr(sys.modules[module], name)
+    assert clyngor.serving.SolvingServer is clyngor.SolvingServer
+    with pytest.raises(AttributeError):
+        clyngor.not_an_attribute
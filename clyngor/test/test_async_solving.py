@@ -0,0 +1,125 @@
+
+import time
+import asyncio
+import pytest
+import clyngor
+from clyngor import asolve
+from .definitions import clingo_noncompliant, skipif_no_clingo_module
+from .test_time_limit import QUEENS, SUDOKU
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(answers):
+    return [answer async for answer in answers]
+
+
+@clingo_noncompliant
+def test_asolve():
+    async def main():
+        answers = await asolve(inline='1{a;b;c}1.')
+        return await collect(answers.no_arg), answers.statistics
+    models, statistics = run(main())
+    assert set(models) == {frozenset('a'), frozenset('b'), frozenset('c')}
+    assert statistics['Models'] == '3'
+    # same parsing as solve
+    expected = clyngor.solve([], inline='1{a;b;c}1.', use_clingo_module=False)
+    tuple(expected)
+    assert set(statistics) == set(expected.statistics)
+    assert '' not in statistics
+
+
+@clingo_noncompliant
+def test_asolve_optimization():
+    async def main():
+        answers = await asolve(inline='1{a;b}. #minimize{1:a; 2:b}.')
+        return await collect(answers.with_optimization.no_arg)
+    models = run(main())
+    assert models[-1] == (frozenset('a'), (1,))
+
+
+@clingo_noncompliant
+def test_asolve_syntax_error():
+    async def main():
+        return await collect(await asolve(inline='a('))
+    with pytest.raises(clyngor.ASPSyntaxError):
+        run(main())
+
+
+@clingo_noncompliant
+@pytest.mark.filterwarnings('error::pytest.PytestUnraisableExceptionWarning')
+def test_asolve_anext():
+    async def main():
+        answers = await asolve(inline='1{a;b;c}1.', nb_model=2)
+        first = await answers.__anext__()
+        second = await answers.__anext__()
+        await answers.aclose()
+        return first, second
+    first, second = run(main())
+    assert first != second
+
+
+@clingo_noncompliant
+def test_asolve_cancel():
+    async def consume():
+        answers = await asolve(inline=QUEENS.replace('200', '400'), nb_model=1)
+        return await collect(answers)
+    async def main():
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.5)
+        start = time.time()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.time() - start
+    assert run(main()) < 1.
+
+
+@clingo_noncompliant
+def test_asolve_cancel_with_full_output():
+    async def consume():
+        answers = await asolve(inline=SUDOKU)
+        return await collect(answers)
+    async def main():
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.5)  # clingo fills the stdout pipe meanwhile
+        start = time.time()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 5)
+        return time.time() - start
+    assert run(main()) < 1.
+
+
+@clingo_noncompliant
+def test_asolve_aclose_with_full_output():
+    async def main():
+        answers = await asolve(inline=SUDOKU)
+        await answers.__anext__()
+        await asyncio.sleep(0.5)  # clingo fills the stdout pipe meanwhile
+        start = time.time()
+        await asyncio.wait_for(answers.aclose(), 5)
+        return time.time() - start
+    assert run(main()) < 1.
+
+
+def test_sync_iteration_forbidden():
+    async def main():
+        return await asolve(inline='', use_clingo_module=False)
+    answers = run(main())
+    with pytest.raises(TypeError):
+        iter(answers)
+
+
+@skipif_no_clingo_module
+def test_asolve_clingo_module():
+    async def main():
+        answers = await asolve(inline='1{a;b;c}1.', use_clingo_module=True)
+        return await collect(answers.no_arg)
+    assert set(run(main())) == {frozenset('a'), frozenset('b'), frozenset('c')}
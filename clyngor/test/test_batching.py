@@ -0,0 +1,97 @@
+
+import io
+import json
+import pickle
+import pytest
+import clyngor
+from clyngor import solve_many
+from clyngor.batching import _run_job, run_manifest
+from concurrent import futures
+
+
+def make_jobs(nb:int):
+    for idx in range(nb):
+        yield {'inline': 'p({}). 1{{a;b}}1.'.format(idx), 'use_clingo_module': False}
+
+
+def test_solve_many():
+    results = dict(solve_many(make_jobs(10), max_workers=2))
+    assert set(results) == set(range(10))
+    for idx, answers in results.items():
+        assert set(answers.no_arg) == {frozenset('pa'), frozenset('pb')}
+        assert answers.statistics['Job time'] > 0
+
+
+def test_solve_many_with_ids_and_errors():
+    jobs = (('good', {'inline': 'a.', 'use_clingo_module': False}),
+            ('bad', {'inline': 'a(', 'use_clingo_module': False}))
+    results = dict(solve_many(jobs, max_workers=2))
+    assert tuple(results['good'].no_arg) == (frozenset('a'),)
+    assert isinstance(results['bad'], clyngor.ASPSyntaxError)
+    assert results['bad'].payload['lineno'] == 2
+
+
+def test_solve_many_is_lazy():
+    consumed = []
+    def jobs():
+        for idx, job in enumerate(make_jobs(100)):
+            consumed.append(idx)
+            yield job
+    with futures.ThreadPoolExecutor(2) as executor:
+        results = solve_many(jobs(), max_pending=3, executor=executor)
+        next(results)
+        assert len(consumed) <= 4
+        results.close()
+
+
+def test_run_job_output_is_picklable():
+    command, records, statistics = _run_job({'inline': '1{a;b}1.', 'use_clingo_module': False})
+    assert pickle.loads(pickle.dumps(records)) == records
+    assert sorted((raw.strip(), opt) for raw, opt in records) == [('a', None), ('b', None)]
+
+
+def test_syntax_error_is_picklable():
+    with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
+        _run_job({'inline': 'a(', 'use_clingo_module': False})
+    error = pickle.loads(pickle.dumps(excinfo.value))
+    assert error.payload == excinfo.value.payload
+    assert str(error) == str(excinfo.value)
+
+
+def test_run_manifest(tmpdir):
+    manifest, out, log = tmpdir.join('jobs.jsonl'), tmpdir.join('results.jsonl'), io.StringIO()
+    manifest.write('\n'.join(json.dumps(job) for job in (
+        {'id': 'first', 'inline': '1{a;b}1.', 'use_clingo_module': False},
+        {'inline': 'p(1..2). #minimize{X:p(X)}.', 'use_clingo_module': False},
+        {'id': 'bad', 'inline': 'a(', 'use_clingo_module': False},
+        {'id': 'already', 'inline': 'a.'},
+    )) + '\n')
+    # interrupted batch, with the results of another manifest
+    out.write('{"id": "other", "models": []}\n{"id": "already", "models": []}\n{"id": "par')
+    with futures.ThreadPoolExecutor(2) as executor:
+        counts = run_manifest(str(manifest), str(out), executor=executor, log=log)
+    assert (counts['solved'], counts['failed'], counts['skipped']) == (2, 1, 1)
+    assert log.getvalue().count('jobs/s') == 3
+    results = {}
+    for line in out.read().splitlines()[2:]:
+        result = json.loads(line)
+        results[result['id']] = result
+    assert set(results) == {'first', 1, 'bad'}
+    assert sorted(results['first']['models']) == [['a'], ['b']]
+    assert results[1]['models'] == [['p(1)', 'p(2)']]
+    assert results[1]['optimization'] == [[3]]
+    assert results[1]['statistics']['Optimum'] == 'yes'
+    assert results['bad']['error']['type'] == 'ASPSyntaxError'
+    # resuming skips the done jobs
+    with futures.ThreadPoolExecutor(2) as executor:
+        counts = run_manifest(str(manifest), str(out), executor=executor, log=None)
+    assert (counts['solved'], counts['failed'], counts['skipped']) == (0, 0, 4)
+
+
+def test_run_manifest_reads_jobs_lazily(tmpdir):
+    manifest, out = tmpdir.join('jobs.jsonl'), tmpdir.join('results.jsonl')
+    manifest.write('{"inline": "a.", "use_clingo_module": false}\n' * 6 + 'not json\n')
+    with futures.ThreadPoolExecutor(1) as executor:
+        with pytest.raises(ValueError):
+            run_manifest(str(manifest), str(out), max_workers=1, executor=executor, log=None)
+    assert len(out.read().splitlines()) >= 4  # solved before reaching the bad line
@@ -0,0 +1,77 @@
+
+import pytest
+import clyngor
+from clyngor import solve, ResultCache
+from .definitions import clingo_noncompliant
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / 'cache.sqlite'))
+
+
+def test_cache_hit(cache):
+    first = solve([], inline='1{a;b}1. #minimize{1:a}.', cache=cache)
+    models = tuple(first.with_optimization.no_arg)
+    assert cache.stats['misses'] == 1
+    assert cache.stats['entries'] == 1
+    second = solve([], inline='1{a;b}1. #minimize{1:a}.', cache=cache)
+    assert tuple(second.with_optimization.no_arg) == models
+    assert second.statistics == first.statistics
+    assert cache.stats['hits'] == 1
+
+
+def test_cache_key_on_file_content(cache, tmp_path):
+    fname = str(tmp_path / 'enc.lp')
+    with open(fname, 'w') as fd:
+        fd.write('a.')
+    assert tuple(solve(fname, inline='b.', cache=cache).no_arg) == (frozenset('ab'),)
+    with open(fname, 'w') as fd:
+        fd.write('c.')
+    assert tuple(solve(fname, inline='b.', cache=cache).no_arg) == (frozenset('bc'),)
+    assert cache.stats['hits'] == 0
+    assert tuple(solve(fname, inline='b.', cache=cache).no_arg) == (frozenset('bc'),)
+    assert cache.stats['hits'] == 1
+    # other options, other result
+    tuple(solve(fname, inline='b.', cache=cache, nb_model=1))
+    assert cache.stats['misses'] == 3
+
+
+def test_cache_only_complete_runs(cache):
+    answers = solve([], inline='1{a;b;c}1.', cache=cache)
+    next(iter(answers))
+    assert cache.stats['entries'] == 0
+    with pytest.raises(clyngor.ASPSyntaxError):
+        tuple(solve([], inline='a(', cache=cache))
+    assert cache.stats['entries'] == 0
+
+
+@clingo_noncompliant
+def test_cache_skips_interrupted_runs(cache):
+    from .test_time_limit import QUEENS, SUDOKU
+    answers = solve([], inline=SUDOKU, time_limit=1, cache=cache)
+    assert tuple(answers)  # but not all of them
+    assert tuple(solve([], inline=QUEENS, time_limit=1, cache=cache)) == ()
+    assert cache.stats['entries'] == 0
+    assert tuple(solve([], inline='1{a;b;c}1.', nb_model=2, cache=cache))
+    assert cache.stats['entries'] == 1
+
+
+def test_cache_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_size=2500)
+    for idx in range(5):
+        tuple(solve([], inline='p({}).'.format(idx), cache=cache))
+    stats = cache.stats
+    assert stats['evictions'] > 0
+    assert 0 < stats['size'] <= 2500
+    tuple(solve([], inline='p(4).', cache=cache))  # most recent is still there
+    assert cache.stats['hits'] == 1
+    cache.clear()
+    assert cache.stats['entries'] == 0
+
+
+def test_cache_key_with_error_on_warning(cache):
+    code = 'a:- b.'  # b does not occur in any rule head
+    assert len(tuple(solve([], inline=code, cache=cache))) == 1
+    with pytest.raises(clyngor.ASPWarning):
+        tuple(solve([], inline=code, cache=cache, error_on_warning=True))
@@ -0,0 +1,39 @@
+
+import pytest
+from clyngor import solve
+from clyngor.answers import load_checkpoint
+from .definitions import skipif_no_clingo_module, clingo_noncompliant
+
+
+ASP_CODE = 'fact. {a;b;c;d}. e:- a, b.'
+
+
+@skipif_no_clingo_module
+def test_resume_enumeration(tmpdir):
+    checkpoint = str(tmpdir.join('models.jsonl'))
+    answers = solve([], inline=ASP_CODE, checkpoint=checkpoint,
+                    checkpoint_every=3, use_clingo_module=True)
+    first = [next(answers) for _ in range(7)]
+    answers.close()  # unsaved models are saved
+    assert len(tuple(load_checkpoint(checkpoint))) == 7
+    answers = solve([], inline=ASP_CODE, checkpoint=checkpoint, use_clingo_module=True)
+    rest = tuple(answers)
+    assert len(rest) == 16 - 7
+    assert not set(first) & set(rest)
+    assert answers.statistics['Checkpointed models'] == 7
+    assert len(tuple(load_checkpoint(checkpoint))) == 16
+    # all models are known: nothing left to find
+    assert tuple(solve([], inline=ASP_CODE, checkpoint=checkpoint,
+                       use_clingo_module=True)) == ()
+
+
+def test_load_checkpoint_ignores_partial_line(tmpdir):
+    checkpoint = tmpdir.join('models.jsonl')
+    checkpoint.write('["a", "b"]\n["c"]\n["d", "e\n')
+    assert tuple(load_checkpoint(str(checkpoint))) == (['a', 'b'], ['c'])
+
+
+@clingo_noncompliant
+def test_checkpoint_needs_module(tmpdir):
+    with pytest.raises(ValueError):
+        solve([], inline=ASP_CODE, checkpoint=str(tmpdir.join('models.jsonl')))
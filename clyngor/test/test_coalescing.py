@@ -0,0 +1,70 @@
+
+import threading
+import pytest
+import clyngor
+from clyngor import solve
+from clyngor.coalescing import Coalescer
+from .definitions import clingo_noncompliant
+
+
+@clingo_noncompliant
+def test_identical_calls_share_clingo(processes):
+    coalescer = Coalescer()
+    first = solve([], inline='1{a;b;c}1.', coalesce=coalescer)
+    second = solve([], inline='1{a;b;c}1.', coalesce=coalescer)
+    other = solve([], inline='1{a;b}1.', coalesce=coalescer)
+    assert len(processes) == 2
+    assert coalescer.leaders == 2 and coalescer.followers == 1
+    assert next(second.no_arg) in {frozenset('a'), frozenset('b'), frozenset('c')}
+    assert set(first.no_arg) == {frozenset('a'), frozenset('b'), frozenset('c')}
+    assert len(tuple(second)) == 2  # the first one was already yielded
+    assert first.statistics['Models'] == second.statistics['Models'] == '3'
+    assert len(tuple(other)) == 2
+    assert coalescer.running == 0
+    # run ended: a new call runs clingo again
+    assert len(tuple(solve([], inline='1{a;b;c}1.', coalesce=coalescer))) == 3
+    assert len(processes) == 3
+
+
+@clingo_noncompliant
+def test_last_close_stops_solver(processes):
+    from .test_time_limit import SUDOKU
+    coalescer = Coalescer()
+    first = solve([], inline=SUDOKU, coalesce=coalescer)
+    second = solve([], inline=SUDOKU, coalesce=coalescer)
+    assert len(processes) == 1
+    assert next(first) == next(second)
+    first.close()
+    assert processes[0].poll() is None
+    assert next(second)
+    second.close()
+    processes[0].wait(5)
+    assert coalescer.running == 0
+
+
+@clingo_noncompliant
+def test_error_is_shared():
+    coalescer = Coalescer()
+    first = solve([], inline='a(', coalesce=coalescer)
+    second = solve([], inline='a(', coalesce=coalescer)
+    for answers in (first, second):
+        with pytest.raises(clyngor.ASPSyntaxError):
+            tuple(answers)
+
+
+@clingo_noncompliant
+def test_concurrent_calls():
+    coalescer = Coalescer()
+    barrier = threading.Barrier(6)
+    results = []
+    def run():
+        barrier.wait()
+        results.append(frozenset(solve([], inline='1{a;b;c}1.', coalesce=coalescer).no_arg))
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert len(results) == 6
+    assert all(result == {frozenset('a'), frozenset('b'), frozenset('c')} for result in results)
+    assert coalescer.leaders + coalescer.followers == 6
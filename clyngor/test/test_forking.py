@@ -0,0 +1,44 @@
+
+import pytest
+import clyngor
+from .definitions import skipif_no_clingo_module
+
+
+ENCODING = """
+col(r;g;b).
+1{color(N,C): col(C)}1:- node(N).
+:- edge(X,Y), color(X,C), color(Y,C).
+"""
+
+
+def instance(nb_node:int) -> str:
+    return 'node(1..{}). edge(X,X+1):- node(X), node(X+1).'.format(nb_node)
+
+
+@skipif_no_clingo_module
+def test_fork_per_instance():
+    from clyngor.forking import ForkServer
+    with ForkServer(inline=ENCODING) as server:
+        for nb_node in (1, 2, 3):
+            answers = server.solve(inline=instance(nb_node))
+            models = tuple(answers.by_predicate)
+            assert len(models) == 3 * 2 ** (nb_node - 1)
+            assert all(len(model['color']) == nb_node for model in models)
+            assert answers.statistics['summary']['models']['enumerated'] == len(models)
+        assert server.forks == 3
+    with pytest.raises(ValueError):
+        server.solve(inline=instance(1))
+
+
+@skipif_no_clingo_module
+def test_fork_errors_and_close():
+    from clyngor.forking import ForkServer
+    server = ForkServer(inline=ENCODING, nb_model=0)
+    with pytest.raises(clyngor.ASPSyntaxError):
+        tuple(server.solve(inline='node(1'))
+    answers = server.solve(inline=instance(40))  # many many models
+    assert next(answers)
+    answers.close()
+    assert tuple(answers) == ()
+    with pytest.raises(clyngor.ASPSyntaxError):
+        ForkServer(inline='col(')
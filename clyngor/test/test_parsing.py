@@ -107,6 +107,13 @@ def test_optimization():
             assert model == expected_stats
 
 
+def test_info_without_answer():
+    output = 'clingo version 5.4.0\nReading from -\nSolving...\nUNSATISFIABLE\n'
+    parsed = tuple(parsing.parse_clasp_output(output, yield_info=True))
+    assert parsed == (('info', tuple(output.splitlines())),)
+    assert tuple(parsing.parse_clasp_output(output)) == ()
+
+
 def test_time_limit():
     parsed = Parser().parse_clasp_output(OUTCLASP_TIME_LIMIT.splitlines(),
                                          yield_stats=True,
@@ -337,3 +344,50 @@ Answer: 2
 b
 Optimization: 3296
 """
+
+
+def test_thread_stats():
+    parsed = dict(parsing.parse_clasp_output(CLINGO_OUTPUT_THREAD_STATS.splitlines(), yield_stats=True))
+    stats = parsed['statistics']
+    assert stats['Models'] == '3'
+    assert stats['Threads'] == '2        (Winner: 1)'
+    assert stats['Thread Stats'] == [
+        {'CPU Time': '0.001s', 'Models': '0', 'Choices': '0'},
+        {'CPU Time': '0.000s', 'Models': '3', 'Choices': '10'},
+    ]
+
+
+def test_progression_parsing():
+    assert parsing.parse_progression('[   2;3299] (Error: 1648.5 Time: 0.003s)') == {
+        'lower': (2,), 'upper': (3299,), 'error': 1648.5}
+
+
+CLINGO_OUTPUT_THREAD_STATS = """clingo version 5.4.0
+Reading from -
+Solving...
+Answer: 1
+a
+Optimization: 0
+OPTIMUM FOUND
+
+Models       : 3
+  Optimum    : yes
+Calls        : 1
+Threads      : 2        (Winner: 1)
+
+Choices      : 10
+
+============ Thread Stats ============
+
+[Thread 0]
+
+CPU Time     : 0.001s
+Models       : 0
+Choices      : 0
+
+[Thread 1]
+
+CPU Time     : 0.000s
+Models       : 3
+Choices      : 10
+"""
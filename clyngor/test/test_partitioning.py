@@ -0,0 +1,64 @@
+
+import pytest
+from clyngor import solve
+from clyngor.partitioning import cubes, partition_atoms
+from .definitions import clingo_noncompliant, skipif_no_clingo_module
+
+
+CODE = 'p(1..6). {x(I)}:- p(I). :- x(I), x(I+1). #show x/1.'
+
+
+def test_cubes_are_disjoint_and_complete():
+    for nb in range(1, 9):
+        found = cubes(nb, 'abc')
+        assert len(found) == nb
+        for a in (True, False):
+            for b in (True, False):
+                for c in (True, False):
+                    assignment = {'a': a, 'b': b, 'c': c}
+                    matching = [cube for cube in found
+                                if all(assignment[atom] == value for atom, value in cube)]
+                    assert len(matching) == 1
+    with pytest.raises(ValueError):
+        cubes(9, 'abc')
+
+
+@clingo_noncompliant
+def test_enumerate_parallel_with_given_atoms():
+    expected = set(solve([], inline=CODE, use_clingo_module=False).atoms_as_string)
+    answers = solve([], inline=CODE, enumerate_parallel=3, partition_atoms=['x(1)', 'x(2)'])
+    found = tuple(answers.atoms_as_string)
+    assert len(found) == len(expected) == 21
+    assert set(found) == expected
+    assert answers.statistics['Models'] == '21'
+    assert len(answers.statistics['Worker Stats']) == 3
+    assert len(answers.statistics['Partition']) == 3
+
+
+@clingo_noncompliant
+def test_enumerate_parallel_with_limit():
+    answers = solve([], inline=CODE, enumerate_parallel=2, partition_atoms=['x(3)'], nb_model=5)
+    assert len(tuple(answers)) == 5
+
+
+@skipif_no_clingo_module
+def test_enumerate_parallel_with_found_atoms():
+    answers = solve([], inline=CODE, enumerate_parallel=4)
+    assert len(set(answers.atoms_as_string)) == 21
+    assert all(':- not x(' in cube or ':- x(' in cube for cube in answers.statistics['Partition'])
+
+
+@skipif_no_clingo_module
+def test_found_atoms_spread_the_models():
+    """Derived atoms are never chosen: each cube gets some of the models"""
+    coloring = ('node(1..6). edge(N,N+1):- node(N), node(N+1). edge(1,6).'
+                ' color(r;g;b). 1{col(N,C): color(C)}1:- node(N).'
+                ' :- edge(N,M), col(N,C), col(M,C). bad(N):- col(N,r), col(N,g).')
+    atoms = partition_atoms(2, inline=coloring)
+    assert all(atom.startswith('col(') for atom in atoms)
+    answers = solve([], inline=coloring, enumerate_parallel=4)
+    assert len(set(answers.atoms_as_string)) == 66
+    worker_models = [int(stats['Models'].rstrip('+'))
+                     for stats in answers.statistics['Worker Stats']]
+    assert sum(worker_models) == 66
+    assert all(worker_models)
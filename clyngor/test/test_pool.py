@@ -0,0 +1,68 @@
+
+import time
+import pytest
+from clyngor import ASP, ClingoPool
+from .definitions import clingo_noncompliant
+
+
+@clingo_noncompliant
+def test_pool_hits():
+    with ClingoPool(2, stats=False) as pool:
+        assert pool.idle == 2
+        for _ in range(5):
+            answers = ASP('1{a;b}1.', pool=pool).no_arg
+            assert set(answers) == {frozenset('a'), frozenset('b')}
+        assert pool.hits == 5
+        assert pool.misses == 0
+        time.sleep(0.5)  # let the pool spawn the replacements
+        assert 1 <= pool.idle <= 2
+
+
+@clingo_noncompliant
+def test_pool_misses_on_other_command():
+    with ClingoPool(1, stats=False) as pool:
+        answers = ASP('a.', pool=pool, nb_model=1).no_arg
+        assert tuple(answers) == (frozenset('a'),)
+        # the command differs from the pool one: pool is not used
+        assert pool.hits == 0
+        assert pool.misses == 1
+
+
+@clingo_noncompliant
+def test_closed_pool():
+    pool = ClingoPool(1, stats=False)
+    pool.close()
+    assert pool.idle == 0
+    assert tuple(ASP('a.', pool=pool).no_arg) == (frozenset('a'),)
+    assert pool.misses == 1
+
+
+def test_bad_pool_size():
+    with pytest.raises(ValueError):
+        ClingoPool(0)
+
+
+def test_pool_with_time_limit():
+    with pytest.raises(ValueError):
+        ClingoPool(1, time_limit=10)
+    with pytest.raises(ValueError):
+        ClingoPool(1, options='--time-limit=10')
+
+
+@clingo_noncompliant
+def test_pool_replaces_dead_processes():
+    with ClingoPool(2, stats=False) as pool:
+        for _ in range(3):
+            for process in tuple(pool._idle):
+                process.kill()
+                process.wait()
+            assert tuple(ASP('a.', pool=pool).no_arg) == (frozenset('a'),)
+            time.sleep(0.5)  # let the pool spawn the replacements
+            assert pool.idle == 2
+        assert pool.misses == 3
+
+
+def test_pool_with_clingo_module():
+    with ClingoPool(1, stats=False) as pool:
+        assert tuple(ASP('a.', pool=pool).no_arg) == (frozenset('a'),)
+        assert pool.hits == 1
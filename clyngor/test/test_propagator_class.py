@@ -98,3 +98,11 @@ def test_pyconstraint_from_python():
         frozenset({('b', (1,))}),
         frozenset({('b', (3,))}),
     }
+
+
+@skipif_no_clingo_module
+def test_clingo_answers_close():
+    answers = clyngor.solve(inline='1{a(1..20)}.', use_clingo_module=True)
+    with answers:
+        assert next(answers)
+    assert tuple(answers) == ()
@@ -0,0 +1,62 @@
+
+import threading
+import pytest
+import clyngor
+from clyngor import solve_many, serving, RemoteExecutor
+from clyngor.remote import SolvingWorker, solve_remotely
+from .definitions import clingo_noncompliant
+
+
+@pytest.fixture
+def workers():
+    """Two workers running in threads, listening on localhost"""
+    workers = [SolvingWorker(('127.0.0.1', 0), workers=2) for _ in range(2)]
+    for worker in workers:
+        threading.Thread(target=worker.serve_forever, daemon=True).start()
+    yield workers
+    for worker in workers:
+        worker.shutdown()
+        worker.server_close()
+
+
+@clingo_noncompliant
+def test_solve_remotely(workers, tmpdir):
+    encoding = tmpdir.join('encoding.lp')
+    encoding.write('1{a(X):p(X)}1.')
+    address = '{}:{}'.format(*workers[0].address)
+    answers = solve_remotely(address, [str(encoding)], inline='p(1..3).')
+    assert set(answers.by_predicate.first_arg_only.atoms_as_string) == {
+        frozenset({'p(1)', 'p(2)', 'p(3)', 'a(1)'}),
+        frozenset({'p(1)', 'p(2)', 'p(3)', 'a(2)'}),
+        frozenset({'p(1)', 'p(2)', 'p(3)', 'a(3)'}),
+    }
+    assert answers.statistics['Models'] == '3'
+    assert serving.request(workers[0].address, 'health')['status'] == 'ok'
+
+
+@clingo_noncompliant
+def test_remote_executor(workers, tmpdir):
+    encoding = tmpdir.join('encoding.lp')
+    encoding.write('1{a(X):p(X)}1.')
+    jobs = [{'files': [str(encoding)], 'inline': 'p(1..{}).'.format(idx + 1)} for idx in range(8)]
+    jobs.append(('bad', {'inline': 'a(', 'use_clingo_module': False}))
+    executor = RemoteExecutor([worker.address for worker in workers], slots=2)
+    with executor:
+        results = dict(solve_many(jobs, executor=executor))
+    for idx in range(8):
+        assert len(tuple(results[idx])) == idx + 1
+        assert results[idx].statistics['Job time'] > 0
+    assert isinstance(results['bad'], clyngor.ASPSyntaxError)
+    assert {results[idx].statistics['Worker'] for idx in range(8)} == {
+        '{}:{}'.format(*worker.address) for worker in workers}
+    assert sum(serving.request(worker.address, 'metrics')['completed'] for worker in workers) == 8
+
+
+def test_remote_executor_errors(workers):
+    with pytest.raises(ValueError):
+        RemoteExecutor([])
+    with RemoteExecutor([workers[0].address]) as executor:
+        with pytest.raises(TypeError):
+            executor.submit(print, 'not a job')
+    with pytest.raises(ValueError):
+        tuple(solve_remotely(workers[0].address, inline='a.', subproc_shell=True))
@@ -0,0 +1,53 @@
+
+import time
+import random
+import signal
+import pytest
+from clyngor import sample, solving
+from .definitions import clingo_noncompliant
+
+
+CODE = 'p(1..30). {x(I)}:- p(I). #show x/1.'
+
+
+@clingo_noncompliant
+def test_sample_is_diverse_and_reproducible():
+    samples = tuple(sample(4, inline=CODE, seed=42, max_workers=2).by_predicate)
+    assert len(samples) == 4
+    assert len(set(frozenset(model.get('x', ())) for model in samples)) == 4
+    again = sample(4, inline=CODE, seed=42, max_workers=3)
+    assert tuple(again.by_predicate) == samples
+    assert again.statistics['Sampling runs'] >= 4
+
+
+@clingo_noncompliant
+def test_sample_small_space():
+    answers = sample(5, inline='1{a;b}1.', seed=1, max_runs=8)
+    assert set(answers.no_arg) == {frozenset('a'), frozenset('b')}
+    assert answers.statistics['Sampling runs'] == 8
+    assert answers.statistics['Duplicated models'] == 6
+
+
+@clingo_noncompliant
+def test_sample_stops_runs_in_flight(monkeypatch):
+    """Once k models are found, the runs still searching are killed"""
+    from .test_time_limit import QUEENS
+    fast_seed = '--seed={}'.format(random.Random(42).randrange(2**31))
+    processes = []
+    def popen(run_command, stdin_feed=None, *args, _popen=solving._popen):
+        if fast_seed not in run_command:  # only the first run is fast
+            stdin_feed = QUEENS.replace('200', '400')
+        processes.append(_popen(run_command, stdin_feed, *args))
+        return processes[-1]
+    monkeypatch.setattr(solving, '_popen', popen)
+    start = time.time()
+    assert len(tuple(sample(1, inline='a.', seed=42, max_workers=2))) == 1
+    assert time.time() - start < 2
+    assert len(processes) >= 2
+    assert all(process.wait() == -signal.SIGKILL for process in processes
+               if fast_seed not in process.args)
+
+
+def test_sample_errors():
+    with pytest.raises(ValueError):
+        sample(0, inline='a.')
@@ -0,0 +1,79 @@
+
+import os
+import time
+import threading
+from clyngor import solve
+from clyngor.scheduling import CoreScheduler, requested_threads, with_threads, split_grant
+from .definitions import clingo_noncompliant
+
+
+def test_requested_threads():
+    assert requested_threads(['-t', '3']) == (3, None)
+    assert requested_threads(['-t3', '--stats']) == (3, None)
+    assert requested_threads(['--parallel-mode', '6,split']) == (6, 'split')
+
+
+def test_with_threads():
+    assert with_threads(['clingo', '--parallel-mode=8', '-'], 3) == [
+        'clingo', '--parallel-mode=3', '-']
+    assert with_threads(['clingo', '-n 0'], 2) == ['clingo', '--parallel-mode=2', '-n 0']
+
+
+def test_split_grant():
+    assert split_grant((0, 1, 2), (8,)) == [(0, 1, 2)]
+    shares = split_grant(tuple(range(5)), (4, 4))
+    assert shares == [(0, 1, 2), (3, 4)]
+
+
+def test_scheduler_queues_over_budget():
+    scheduler = CoreScheduler(4)
+    first = scheduler.acquire(3)
+    assert len(first) == 3
+    assert scheduler.acquire(2, timeout=0.1) is None  # only one core left
+    granted = []
+    waiter = threading.Thread(target=lambda: granted.append(scheduler.acquire(2)))
+    waiter.start()
+    time.sleep(0.1)
+    assert scheduler.metrics()['queued'] == 1
+    scheduler.release(first)
+    waiter.join(5)
+    assert len(granted[0]) == 2
+    assert not set(granted[0]) & set(scheduler._free)
+    scheduler.release(granted[0])
+    metrics = scheduler.metrics()
+    assert metrics['completed'] == 2
+    assert metrics['busy cores'] == metrics['running'] == metrics['queued'] == 0
+    assert metrics['max queue delay'] >= 0.1
+
+
+def test_scheduler_caps_threads():
+    scheduler = CoreScheduler(2, max_threads=1)
+    assert len(scheduler.acquire(8)) == 1
+    assert len(scheduler.acquire(0)) == 1
+
+
+@clingo_noncompliant
+def test_solve_with_scheduler(processes):
+    scheduler = CoreScheduler(1)
+    answers = solve([], inline='1{a;b}1.', options='-t 8', scheduler=scheduler)
+    assert '--parallel-mode=1 ' in answers.command
+    assert '-t 8' not in answers.command
+    if hasattr(os, 'sched_getaffinity') and processes[0].poll() is None:
+        assert os.sched_getaffinity(processes[0].pid) == set(scheduler.cores)
+    assert len(tuple(answers)) == 2
+    processes[0].wait()
+    time.sleep(0.1)  # cores are released by another thread
+    assert scheduler.metrics()['completed'] == 1
+    assert scheduler.metrics()['busy cores'] == 0
+
+
+@clingo_noncompliant
+def test_portfolio_with_scheduler():
+    """The members of a portfolio share the granted cores"""
+    scheduler = CoreScheduler(4, pin=False)
+    answers = solve([], inline='1{a;b}1.', options='-t 4', scheduler=scheduler,
+                    portfolio=('--configuration=frumpy', '--configuration=jumpy'))
+    assert len(tuple(answers)) == 2
+    threads = [int(cmd.split('--parallel-mode=')[1].split()[0])
+               for cmd in answers.command.splitlines()]
+    assert threads == [2, 2]
@@ -0,0 +1,76 @@
+
+import os
+import threading
+import pytest
+from clyngor import solve, serving, ASPSyntaxError
+from clyngor.serving import SolvingServer
+from .definitions import clingo_noncompliant
+
+
+@pytest.fixture
+def server(tmpdir):
+    """Daemon running in a thread, with two workers"""
+    server = SolvingServer(str(tmpdir.join('clyngor.sock')), workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_health_and_metrics(server):
+    health = serving.request(server.path, 'health')
+    assert health['status'] == 'ok'
+    assert health['pid'] == os.getpid()
+    metrics = serving.request(server.path, 'metrics')
+    assert metrics['workers'] == 2
+    assert metrics['requests'] == 2
+    assert metrics['active'] == metrics['queued'] == 0
+    with pytest.raises(ValueError):
+        serving.request(server.path, 'unknown')
+    assert serving.request(server.path, 'metrics')['failed'] == 1
+
+
+def test_socket_in_use(server):
+    with pytest.raises(OSError):
+        SolvingServer(server.path)
+
+
+@clingo_noncompliant
+def test_solve_on_server(server):
+    answers = solve([], inline='1{a;b;c}1.', server=server.path)
+    assert set(answers.no_arg) == {frozenset('a'), frozenset('b'), frozenset('c')}
+    assert answers.statistics['Models'].startswith('3')
+    metrics = serving.request(server.path, 'metrics')
+    assert metrics['completed'] == 1 and metrics['failed'] == 0
+
+
+@clingo_noncompliant
+def test_solve_on_server_with_optimization(server):
+    answers = solve([], inline='1{a(1..3)}1. #maximize{X:a(X)}.', server=server.path,
+                    options='--opt-mode=optN')
+    assert list(answers.with_optimization.no_arg)[-1][1] == (-3,)
+
+
+@clingo_noncompliant
+def test_error_on_server(server):
+    with pytest.raises(ASPSyntaxError):
+        tuple(solve([], inline='a :- b', server=server.path))
+    with pytest.raises(ValueError):
+        tuple(serving.solve_on_server(server.path, inline='a.', subproc_shell=True))
+    assert serving.request(server.path, 'metrics')['failed'] == 2
+
+
+@clingo_noncompliant
+def test_timeout_on_server(tmpdir):
+    server = SolvingServer(str(tmpdir.join('clyngor.sock')), workers=1, timeout=0.5)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        answers = solve([], inline='p(1..30). {q(X)}:- p(X).', server=server.path)
+        assert len(tuple(answers)) < 2**30
+        assert answers.statistics['Deadline reached'] is True
+        assert serving.request(server.path, 'metrics')['timeouts'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
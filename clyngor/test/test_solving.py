@@ -1,9 +1,10 @@
 
+import time
 import pytest
 from .test_api import asp_code  # fixture
 import clyngor
-from clyngor import solve
-from .definitions import clingo_noncompliant
+from clyngor import solve, solving
+from .definitions import clingo_noncompliant, skipif_no_clingo_module
 
 
 @pytest.fixture
@@ -35,3 +36,306 @@ def test_constants(asp_code_with_constants):
 
 
 # TODO: test solving.command
+
+
+@clingo_noncompliant
+def test_portfolio():
+    configurations = ('--configuration=frumpy', '--configuration=jumpy',
+                      ['--configuration=tweety'])
+    answers = solve([], inline='1{a;b;c}1.', portfolio=configurations).no_arg
+    assert answers.command.count('\n') == 2
+    assert set(answers) == {frozenset('a'), frozenset('b'), frozenset('c')}
+    winner = answers.statistics['Portfolio']
+    assert winner['options'] in {'--configuration=frumpy',
+                                 '--configuration=jumpy',
+                                 '--configuration=tweety'}
+    assert 0 <= winner['winner'] < 3
+
+
+@clingo_noncompliant
+def test_portfolio_optimization():
+    answers = solve([], inline='1{a;b;c}. #minimize{1,X: x(X)}. x(1):- a. x(2):- b. x(3):- c.',
+                    portfolio=('--opt-strategy=bb', '--opt-strategy=usc'))
+    models = tuple(answers.with_optimization)
+    assert models[-1][1] == (1,)
+    assert answers.statistics['Portfolio']['winner'] in {0, 1}
+
+
+@clingo_noncompliant
+def test_portfolio_failing_member():
+    code = 'p(1..16). {x(I)}:- p(I). :- x(I), x(I+1). #maximize{I: x(I)}.'
+    answers = solve([], inline=code, portfolio=('--configuration=frumpy', '--no-such-option'))
+    models = tuple(answers.with_optimization)
+    assert models[-1][1] == (-72,)
+    assert answers.statistics['Portfolio'] == {'winner': 0, 'options': '--configuration=frumpy'}
+    answers = solve([], inline=code, portfolio=('--no-such-option', '--other-bad-option'))
+    with pytest.raises(RuntimeError) as excinfo:
+        tuple(answers)
+    assert 'option' in str(excinfo.value)
+
+
+@clingo_noncompliant
+def test_warning_aborts_run():
+    """Error is raised without waiting for the end of a very long run"""
+    from .test_time_limit import QUEENS
+    start = time.time()
+    with pytest.raises(clyngor.ASPWarning):
+        tuple(solve([], inline=QUEENS + 'b:- c.', error_on_warning=True))
+    assert time.time() - start < 10
+
+
+@clingo_noncompliant
+def test_close_kills_solver(processes):
+    from .test_time_limit import SUDOKU
+    with solve([], inline=SUDOKU) as answers:
+        assert next(answers)
+        assert processes[0].poll() is None
+    assert processes[0].poll() is not None
+    assert tuple(answers) == ()
+
+@clingo_noncompliant
+def test_close_runs_on_end():
+    ended = []
+    answers = clyngor.Answers(('a', 'b'), on_end=lambda: ended.append(True))
+    assert next(answers) == {('a', ())}
+    answers.close()
+    answers.close()
+    assert ended == [True]
+
+
+def test_next_keeps_iterator():
+    answers = clyngor.Answers(iter(('a', 'b', 'c')))
+    assert [next(answers), next(answers), next(answers)] == [
+        {('a', ())}, {('b', ())}, {('c', ())}]
+    with pytest.raises(StopIteration):
+        next(answers)
+
+
+@clingo_noncompliant
+def test_deadline():
+    """A sub-second deadline stops a very long run, keeping the first models"""
+    from .test_time_limit import SUDOKU
+    start = time.time()
+    answers = solve([], inline=SUDOKU, deadline=0.8)
+    models = tuple(answers)
+    assert time.time() - start < 5
+    assert answers.statistics['Deadline reached'] is True
+    assert models  # the sudoku has far more models than that
+
+
+@skipif_no_clingo_module
+def test_deadline_with_clingo_module():
+    """The deadline counts the grounding, that can't be interrupted"""
+    from .test_time_limit import QUEENS, SUDOKU
+    start = time.time()
+    answers = solve([], inline=SUDOKU, deadline=0.8, use_clingo_module=True)
+    assert tuple(answers)
+    assert time.time() - start < 5
+    assert answers.statistics['Deadline reached'] is True
+    start = time.time()
+    answers = solve([], inline=QUEENS, deadline=0.3, nb_model=1, use_clingo_module=True)
+    grounded = time.time() - start  # far longer than the deadline
+    assert tuple(answers) == ()
+    assert time.time() - start < grounded + 0.5
+    assert answers.statistics['Deadline reached'] is True
+
+
+def test_deadline_not_reached():
+    answers = solve([], inline='1{a;b}1.', deadline=30)
+    assert len(tuple(answers)) == 2
+    assert 'Deadline reached' not in answers.statistics
+
+
+@clingo_noncompliant
+def test_rusage():
+    answers = solve([], inline='1{a;b}1.', rusage=True)
+    assert len(tuple(answers)) == 2
+    resources = answers.statistics['Resources']
+    assert set(resources) == {'User time', 'System time', 'Max RSS',
+                              'Wall time', 'Bytes read'}
+    assert resources['Max RSS'] > 0
+    assert resources['Bytes read'] > 0
+
+
+def test_resources_of_polled_process():
+    """Resources are kept when the process is reaped by poll"""
+    clingo = solving._popen([clyngor.CLINGO_BIN_PATH, '--version'])
+    clingo.stdout.read()
+    while clingo.poll() is None:
+        time.sleep(0.01)
+    assert clingo.returncode == 0
+    assert clingo.resources()['Max RSS'] > 0
+    solving._kill(clingo)
+
+
+def test_kill_waits_stderr_reader():
+    """The error output is not closed while its reader is reading it"""
+    from .test_time_limit import QUEENS
+    clingo = solving._popen(solving.command(), QUEENS)
+    reader = solving._StderrReader(clingo)
+    solving._kill(clingo, reader)
+    assert not reader.is_alive()
+    assert clingo.stderr.closed
+
+
+@clingo_noncompliant
+def test_memory_limit():
+    with pytest.raises(clyngor.ResourceLimitError) as excinfo:
+        tuple(solve([], inline='p(1..2000). q(X,Y):- p(X), p(Y).',
+                    memory_limit=200 * 2**20))
+    assert excinfo.value.resource == 'memory'
+    assert excinfo.value.limit == 200 * 2**20
+
+
+@clingo_noncompliant
+def test_cpu_limit():
+    from .test_time_limit import QUEENS
+    start = time.time()
+    with pytest.raises(clyngor.ResourceLimitError) as excinfo:
+        tuple(solve([], inline=QUEENS, cpu_limit=1))
+    assert time.time() - start < 10
+    assert excinfo.value.resource == 'cpu'
+    assert excinfo.value.limit == 1
+    assert 'User time' in excinfo.value.usage
+
+
+def test_time_limit_option():
+    assert solving._time_limit_option(solving.command([], time_limit=3)) == 3
+    assert solving._time_limit_option(['clingo', '--time-limit', '4']) == 4
+    assert solving._time_limit_option('clingo -n 0') == 0
+
+
+def test_cpu_limit_must_be_whole():
+    with pytest.raises(ValueError):
+        solving._limiter(cpu_limit=0.5)
+
+
+def test_command_threads():
+    cmd = solving.command([], threads=4, parallel_mode='split', stats=False)
+    assert '--parallel-mode=4,split' in cmd
+    assert '--stats=2' in solving.command([], stats=2)
+    with pytest.raises(ValueError):
+        solving.command([], threads=2, parallel_mode='race')
+    with pytest.raises(ValueError):
+        solving.command([], threads=0, parallel_mode='split')
+
+
+@clingo_noncompliant
+def test_threads_and_progress():
+    events = []
+    answers = solve([], inline='p(1..14). {x(I)}:- p(I). :- x(I), x(I+1). #maximize{I: x(I)}.',
+                    threads=2, parallel_mode='compete', stats=2, progress=events.append)
+    models = tuple(answers.with_optimization)
+    assert models[-1][1] == (-56,)
+    assert events == answers.progression
+    model_events = [event for event in events if event['event'] == 'model']
+    assert [event['optimization'] for event in model_events] == [opt for _, opt in models]
+    assert all(event['time'] >= 0 for event in events)
+    for event in events:
+        if event['event'] == 'progression':
+            assert set(event) == {'event', 'time', 'lower', 'upper', 'error'}
+    assert len(answers.statistics['Thread Stats']) == 2
+
+
+@clingo_noncompliant
+def test_progress_before_first_model():
+    """Core-guided strategies update the bounds before the first model"""
+    events = []
+    answers = solve([], inline='1{x(1..30)}. #minimize{X: x(X)}. :- x(X), X < 25.',
+                    options='--opt-strategy=usc', threads=2, progress=events.append)
+    assert tuple(answers.with_optimization)[-1][1] == (25,)
+    kinds = [event['event'] for event in events]
+    assert 'progression' in kinds
+    assert kinds.index('progression') < kinds.index('model')
+
+
+def _check_warm_start(use_clingo_module:bool):
+    code = 'p(1..14). {x(I)}:- p(I). :- x(I), x(I+1). #maximize{I: x(I)}.'
+    best = tuple(solve([], inline=code, use_clingo_module=use_clingo_module))[-1]
+    answers = solve([], inline=code, warm_start=best, use_clingo_module=use_clingo_module)
+    assert next(iter(answers)) == best
+    answers = solve([], inline=code, options='--opt-mode=optN',
+                    warm_start={'x': {(1,), (3,)}}, use_clingo_module=use_clingo_module)
+    assert next(iter(answers.by_predicate))['x'] == {(1,), (3,)}
+
+
+@clingo_noncompliant
+def test_warm_start():
+    _check_warm_start(use_clingo_module=False)
+
+
+@skipif_no_clingo_module
+def test_warm_start_with_clingo_module():
+    _check_warm_start(use_clingo_module=True)
+
+
+@skipif_no_clingo_module
+def test_preflight(tmpdir, monkeypatch):
+    parsed = []
+    def parsing_error(name, content, _parsing_error=solving._parsing_error):
+        parsed.append(name)
+        return _parsing_error(name, content)
+    monkeypatch.setattr(solving, '_parsing_error', parsing_error)
+    monkeypatch.setattr(solving, '_PREFLIGHT_VERDICTS', {})
+    encoding = tmpdir.join('encoding.lp')
+    encoding.write('p(1).\nq(X :- p(X).')
+    for _ in range(2):  # the verdict is computed once
+        with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
+            solve(str(encoding), inline='r.', preflight=True)
+    assert parsed == [str(encoding)]
+    payload = excinfo.value.payload
+    assert (payload['filename'], payload['lineno'], payload['char_beg']) == (str(encoding), 2, 5)
+    assert set(payload) == {'filename', 'lineno', 'char_beg', 'char_end', 'level',
+                            'message', 'text', 'human message'}
+    encoding.write('p(1).\nq(X):- p(X).')
+    for _ in range(2):
+        assert len(tuple(solve(str(encoding), inline='r.', preflight=True))) == 1
+    assert parsed == [str(encoding)] * 2 + ['-']
+    # inline code errors are the ones of the clingo run
+    code = 'a.\nb(.'
+    with pytest.raises(clyngor.ASPSyntaxError) as excinfo:
+        solve([], inline=code, preflight=True)
+    with pytest.raises(clyngor.ASPSyntaxError) as run_excinfo:
+        tuple(solve([], inline=code, use_clingo_module=False))
+    assert excinfo.value.payload == run_excinfo.value.payload
+
+
+def test_clingo_version_cache(tmpdir, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir.join('cache')))
+    monkeypatch.setattr(solving, '_PROBES', {})
+    runs = tmpdir.join('runs')
+    binary = tmpdir.join('clingo')
+    binary.write('#!/bin/sh\necho run >> {}\necho "clingo version 5.4.0"\n'
+                 'echo "with Python 3.8"\necho "without Lua"\n'.format(runs))
+    binary.chmod(0o755)
+    for _ in range(3):
+        version = clyngor.clingo_version(str(binary))
+        assert (version['clingo version'], version['python'], version['lua']) == ('5.4.0', '3.8', None)
+    assert len(runs.readlines()) == 1
+    solving._PROBES.clear()  # new process: the probe is read on disk
+    assert clyngor.clingo_version(str(binary))['clingo version'] == '5.4.0'
+    assert len(runs.readlines()) == 1
+    binary.write(binary.read().replace('5.4.0', '5.10.0'))  # the binary changed
+    assert clyngor.clingo_version(str(binary))['clingo version'] == '5.10.0'
+    assert len(runs.readlines()) == 2
+    clyngor.clear_probe_cache()
+    assert clyngor.clingo_version(str(binary))['clingo version'] == '5.10.0'
+    assert clyngor.clingo_version(str(binary), cached=False)['clingo version'] == '5.10.0'
+    assert len(runs.readlines()) == 4
+    monkeypatch.setattr(clyngor, 'CLINGO_BIN_PATH', str(binary))
+    assert clyngor.have_python_support() and not clyngor.have_lua_support()
+    capabilities = clyngor.capabilities()
+    assert capabilities['clingo binary'] == str(binary)
+    assert capabilities['python support'] == '3.8'
+    assert len(runs.readlines()) == 4
+
+
+@skipif_no_clingo_module
+def test_running_sequence_without_inline(tmpdir):
+    encoding = tmpdir.join('encoding.lp')
+    encoding.write('a. b:- a.')
+    def running_sequence(programs, files, nb_model, propagators, observers, generator):
+        return clyngor.Main(programs=programs, files=files, nb_model=nb_model,
+                            generator=generator)
+    answers = solve(str(encoding), running_sequence=running_sequence)
+    assert tuple(answers.no_arg) == (frozenset('ab'),)
@@ -0,0 +1,54 @@
+
+import pytest
+from clyngor import solve, tune, tuning
+from clyngor.answers import Answers
+from .definitions import clingo_noncompliant
+
+
+@pytest.fixture
+def cache_dir(tmpdir, monkeypatch):
+    """User cache directory, where profiles are stored by default"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir.join('cache')))
+    return tmpdir.join('cache')
+
+
+def test_measures():
+    answers = Answers((), statistics={'Models': '2', 'Optimum': 'yes', 'Optimization': '3',
+                                      'Time': '0.012s (Solving: 0.01s 1st Model: 0.00s Unsat: 0.00s)'})
+    assert tuning._measures(answers) == {'first model': 0., 'optimum': 0.012, 'time': 0.012, 'score': 0.012}
+    answers = Answers((), statistics={'Models': '1+', 'Optimum': 'unknown', 'Optimization': '3',
+                                      'Time': '0.012s (Solving: 0.01s 1st Model: 0.00s Unsat: 0.00s)'})
+    assert tuning._measures(answers)['score'] is None
+    answers = Answers((), statistics={'Models': '1', 'Deadline reached': True})
+    assert tuning._measures(answers)['time'] is None
+    assert tuning._measures(ValueError('bad'))['error'] == 'ValueError: bad'
+
+
+def test_profiles(cache_dir):
+    assert tuning.profiles() == {}
+    tuning.save_profile('fast', '--configuration=frumpy -t 2', score=1.2)
+    tuning.save_profile('other', ['--opt-strategy=usc'])
+    assert tuning.load_profile('fast') == ['--configuration=frumpy', '-t', '2']
+    assert tuning.profiles()['fast']['score'] == 1.2
+    with pytest.raises(KeyError):
+        tuning.load_profile('unknown')
+
+
+@clingo_noncompliant
+def test_tune_and_solve_with_profile(tmpdir, cache_dir):
+    encoding = tmpdir.join('encoding.lp')
+    encoding.write('1{q(X):p(X)}. #minimize{X:q(X)}. :- q(X), q(X+1).')
+    instances = []
+    for idx in range(2):
+        instances.append(str(tmpdir.join('instance{}.lp'.format(idx))))
+        tmpdir.join('instance{}.lp'.format(idx)).write('p(1..{}).'.format(5 + idx))
+    candidates = ['--opt-strategy=usc', '--configuration=frumpy --no-such-option']
+    results = tune(str(encoding), instances, candidates, budget=10, name='test', max_workers=2)
+    # failed runs count as runs reaching the budget
+    assert results['options'] == ['--opt-strategy=usc']
+    assert results['results'][1]['score'] == 20.
+    assert len(results['results'][0]['runs']) == 2
+    assert tuning.load_profile('test') == ['--opt-strategy=usc']
+    answers = solve([str(encoding), instances[0]], profile='test', use_clingo_module=False)
+    assert '--opt-strategy=usc' in answers.command
+    assert tuple(answers.by_predicate)[-1]['q'] == {(1,)}
@@ -0,0 +1,155 @@
+"""Empirical tuning of clingo options for an encoding.
+
+Each candidate set of options is run on each sample instance, and the one
+reaching the optimum (or the end of the search) the fastest is kept,
+and saved as a named profile:
+
+    tune('encoding.lp', ['small.lp', 'medium.lp'], name='my-encoding',
+         candidates=['--configuration=frumpy', '--configuration=jumpy',
+                     '--opt-strategy=usc'], budget=30)
+    answers = solve(['encoding.lp', 'large.lp'], profile='my-encoding')
+
+Profiles are stored in a JSON file, by default in the user cache directory.
+
+"""
+
+
+import os
+import re
+import json
+import shlex
+import threading
+
+from clyngor import utils
+from clyngor.batching import solve_many
+
+
+def tune(encoding:str or iter, instances:iter, candidates:iter,
+         budget:float=None, name:str=None, max_workers:int=None,
+         profiles:str=None, nb_model:int=0, **kwargs) -> dict:
+    """Return the results of each candidate options on given instances,
+    and the best options found, saved under given profile name if any.
+
+    encoding -- file or iterable of files of the encoding
+    instances -- iterable of instance files, each one solved with the encoding
+    candidates -- iterable of options (string or iterable) to compare
+    budget -- maximal number of seconds of each run. A run reaching it counts
+              for twice the budget.
+    name -- name of the profile saving the best options
+    max_workers -- number of runs made in parallel (see solve_many)
+    profiles -- JSON file of the profiles (default in user cache directory)
+    nb_model -- number of models asked to clingo ; 1 is enough
+                for non-optimization problems
+    kwargs -- other parameters of solve(), given to each run
+
+    The returned dict gives the 'options' of the best candidate,
+    its 'score', i.e. its mean time in seconds to reach the optimum (or the end
+    of the search, for non-optimization problems), and the 'results' of each
+    candidate: its options, score, mean time to first model, and runs.
+
+    """
+    encoding = [encoding] if isinstance(encoding, str) else list(encoding)
+    instances = tuple(instances)
+    candidates = tuple(_as_options(options) for options in candidates)
+    if not candidates or not instances:
+        raise ValueError("Tuning needs at least one candidate and one instance.")
+    jobs = (
+        ((idx, instance), dict(kwargs, files=encoding + [instance], options=options,
+                               nb_model=nb_model, deadline=budget, stats=True,
+                               use_clingo_module=False))
+        for idx, options in enumerate(candidates)
+        for instance in instances
+    )
+    runs = [{} for _ in candidates]  # instance -> measures, for each candidate
+    for (idx, instance), answers in solve_many(jobs, max_workers=max_workers):
+        runs[idx][instance] = _measures(answers)
+    penalty = 2. * budget if budget else float('inf')
+    results = []
+    for options, candidate_runs in zip(candidates, runs):
+        scores = [penalty if run['score'] is None else run['score']
+                  for run in candidate_runs.values()]
+        firsts = [penalty if run['first model'] is None else run['first model']
+                  for run in candidate_runs.values()]
+        results.append({
+            'options': options,
+            'score': sum(scores) / len(scores),
+            'first model': sum(firsts) / len(firsts),
+            'runs': candidate_runs,
+        })
+    best = min(results, key=lambda result: (result['score'], result['first model']))
+    if name:
+        save_profile(name, best['options'], profiles, score=best['score'],
+                     encoding=encoding, instances=list(instances))
+    return {'options': best['options'], 'score': best['score'], 'results': results}
+
+
+def _as_options(options:str or iter) -> list:
+    return shlex.split(options) if isinstance(options, str) else list(map(str, options))
+
+
+def _measures(answers:object) -> dict:
+    """Return the times measured in statistics of given Answers,
+    None for the ones not reached, or for a failed run.
+
+    """
+    measures = {'first model': None, 'optimum': None, 'time': None, 'score': None}
+    if isinstance(answers, Exception):
+        measures['error'] = '{}: {}'.format(type(answers).__name__, answers)
+        return measures
+    statistics = answers.statistics
+    time = REG_TIME.match(statistics.get('Time', ''))
+    if statistics.get('Deadline reached') or not time:
+        return measures
+    measures['time'] = float(time.group(1))
+    first_model = REG_FIRST_MODEL.search(statistics['Time'])
+    if first_model and not statistics.get('Models', '0').startswith('0'):
+        measures['first model'] = float(first_model.group(1))
+    if statistics.get('Optimum') == 'yes':
+        measures['optimum'] = measures['time']
+    is_optimization = 'Optimization' in statistics or 'Optimum' in statistics
+    measures['score'] = measures['optimum'] if is_optimization else measures['time']
+    return measures
+
+REG_TIME = re.compile(r'\s*([0-9.]+)s')
+REG_FIRST_MODEL = re.compile(r'1st Model:\s*([0-9.]+)s')
+
+
+_PROFILES_LOCK = threading.Lock()
+
+def _profiles_path(path:str=None) -> str:
+    return path or os.path.join(utils.user_cache_dir(), 'profiles.json')
+
+
+def profiles(path:str=None) -> dict:
+    """Return the saved profiles, as a mapping name -> profile,
+    each profile being a mapping with at least the key 'options'.
+
+    """
+    path = _profiles_path(path)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fd:
+        return json.load(fd)
+
+
+def save_profile(name:str, options:str or iter, path:str=None, **infos):
+    """Save given options as the profile of given name,
+    with given infos about it.
+
+    """
+    path = _profiles_path(path)
+    with _PROFILES_LOCK:
+        saved = profiles(path)
+        saved[name] = dict(infos, options=_as_options(options))
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as fd:
+            json.dump(saved, fd, indent=2)
+        os.replace(tmp, path)  # never leave a partially written file
+
+
+def load_profile(name:str, path:str=None) -> list:
+    """Return the options of the profile of given name"""
+    saved = profiles(path)
+    if name not in saved:
+        raise KeyError("No profile named {} in {}.".format(repr(name), _profiles_path(path)))
+    return list(saved[name]['options'])
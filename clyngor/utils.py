@@ -2,14 +2,10 @@
 
 
 import os
-import tempfile
+import math
+import functools
 from clyngor import parsing
 
-try:
-    import clingo
-except ImportError:
-    clingo = None
-
 
 class ASPSyntaxError(SyntaxError):
     """This is a SyntaxError, but without the filename at the end of the
@@ -25,6 +21,9 @@ class ASPSyntaxError(SyntaxError):
     def __str__(self):
         return self.msg
 
+    def __reduce__(self):  # payload is keyword only, and lost by default pickling
+        return functools.partial(type(self), payload=self.payload), self.args
+
 class ASPWarning(ValueError):
     """This is a ValueError, with a payload attached to it"""
     def __init__(self, msg:str, payload:dict):
@@ -32,6 +31,27 @@ class ASPWarning(ValueError):
         self.payload = payload
         self.atom = payload['atom']
 
+    def __reduce__(self):
+        return type(self), (self.args[0], self.payload)
+
+class ResourceLimitError(RuntimeError):
+    """Raised when clingo was stopped by one of the resource limits
+    given to the solving method.
+
+    resource -- the exceeded resource, 'memory' or 'cpu'
+    limit -- the limit given for this resource
+    usage -- resources used by clingo, as given in statistics
+
+    """
+    def __init__(self, msg:str, resource:str, limit:int, usage:dict):
+        super().__init__(msg)
+        self.resource = resource
+        self.limit = limit
+        self.usage = usage
+
+    def __reduce__(self):
+        return type(self), (self.args[0], self.resource, self.limit, self.usage)
+
 
 def make_hashable(val):
     """Convert lists and sets into tuples and frozensets
@@ -61,7 +81,7 @@ def clingo_value_to_python(value:object) -> int or str or tuple:
         return tuple(map(clingo_value_to_python, value))
     elif type(value).__name__ == 'Symbol':
         try:
-            typename = str(value.type).lower()
+            typename = str(value.type).lower().split('.')[-1]  # clingo 5.5 prefixes with symboltype.
             if typename == 'function':
                 if value.arguments:
                     pyvalue = (value.name, tuple(map(clingo_value_to_python, value.arguments)))
@@ -157,6 +177,7 @@ def save_answers_in_file(answers:iter, filename:str or None=None,
 
     """
     if not filename:
+        import tempfile  # slow to import, and rarely needed
         with tempfile.NamedTemporaryFile('w', delete=False) as ofd:
             filename = ofd.name
     with open(filename, 'w') as ofd:
@@ -180,3 +201,14 @@ def cleaned_path(path:str, error_if_invalid:bool=True) -> str:
     if error_if_invalid and not os.path.exists(path):
         open(path)  # will raise FileExistsError
     return path
+
+
+def user_cache_dir(*subdirs:str) -> str:
+    """Return the path to the clyngor directory in user cache,
+    created if necessary.
+
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join('~', '.cache')
+    path = os.path.join(os.path.expanduser(base), 'clyngor', *subdirs)
+    os.makedirs(path, exist_ok=True)
+    return path